@@ -0,0 +1,193 @@
+"""Кеш страниц с точной инвалидацией через версии зависимостей.
+
+Зависимость — строка вроде 'group:cats'. Для каждой зависимости в кеше
+лежит версия: случайный токен, который меняет bump(). Закешированная
+страница хранит версии своих зависимостей на момент рендера и считается
+свежей, пока все они совпадают с текущими. Инвалидация любой группы
+страниц — это запись одного ключа, сколько бы страниц от него ни зависело.
+
+Страница кешируется одна на всех пользователей: всё, что зависит от
+request.user, вынесено в персональные фрагменты (core.personal).
+Страницы и результаты запросов хранятся в двухуровневом кеше
+(core.tiered), который не даёт пересчитывать одну страницу параллельно.
+Версии зависимостей служат и валидатором ETag: повторный запрос страницы,
+которая не менялась, получает 304 без рендера шаблонов.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    http_date, parse_http_date_safe, quote_etag, urlencode,
+)
+from django.utils.translation import get_language
+
+from core import personal
+from core.tiered import tiered_cache
+
+# Параметры запроса, которые читают закешированные view. Остальные не
+# попадают ни в ключ страницы, ни в view: иначе ?x=1, ?x=2, ... создавали
+# бы новые записи и вытесняли горячие страницы из общего кеша.
+PAGE_PARAMS = ('page', 'after', 'before', 'q', 'fields', 'limit')
+
+
+def _version_key(name):
+    return f'version:{name}'
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _set_new_versions(names):
+    cache.set_many(
+        {_version_key(name): _new_version() for name in names}, None
+    )
+
+
+def bump(*names):
+    """Делает недействительным всё, что зависит от names.
+
+    Внутри транзакции версии меняются ещё раз после коммита: иначе между
+    сбросом и коммитом в кеш успели бы попасть старые данные.
+    """
+    if not names:
+        return
+    _set_new_versions(names)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_new_versions(names))
+
+
+def get_versions(names):
+    """Текущие версии зависимостей одним запросом к кешу."""
+    keys = {_version_key(name): name for name in names}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {name: found[key] for key, name in keys.items()}
+
+
+def add_dependencies(response, *names):
+    """Отмечает зависимости, которые стали известны только при рендере."""
+    response.cache_dependencies = (
+        set(getattr(response, 'cache_dependencies', ())) | set(names)
+    )
+    return response
+
+
+def _page_query(request):
+    """Только параметры из PAGE_PARAMS, по одному значению и по порядку."""
+    return urlencode([
+        (name, request.GET[name]) for name in PAGE_PARAMS
+        if name in request.GET
+    ])
+
+
+def _page_key(request, per_host=False):
+    path = f'{request.path}?{_page_query(request)}'
+    if per_host:
+        path = f'{request.scheme}://{request.get_host()}{path}'
+    path = path.encode()
+    return f'page:{get_language()}:{hashlib.md5(path).hexdigest()}'
+
+
+def is_fresh(entry):
+    """Записаны ли versions из (versions, value) до последних bump()."""
+    versions = entry[0]
+    return get_versions(versions) == versions
+
+
+def _is_cacheable(entry):
+    response = entry[1]
+    return response.status_code == 200 and not response.streaming
+
+
+def _etag(request, versions, per_host=False):
+    """Валидатор страницы: версии её зависимостей и сессия посетителя.
+
+    Персональные фрагменты зависят только от того, кто вошёл на сайт, а
+    вход и выход меняют ключ сессии, поэтому базу спрашивать не нужно.
+    """
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME, '')
+    digest = hashlib.md5(_page_key(request, per_host).encode())
+    for name, version in sorted(versions.items()):
+        digest.update(f'{name}={version};'.encode())
+    digest.update(session.encode())
+    return quote_etag(digest.hexdigest())
+
+
+def _personalize(request, response):
+    # Метки фрагментов бывают только в HTML: в JSON и лентах «<» не
+    # экранируется, и метку мог бы вписать автор поста.
+    if (
+        not response.streaming
+        and response.get('Content-Type', '').startswith('text/html')
+    ):
+        response.content = personal.stitch(
+            request, response.content.decode(response.charset)
+        )
+    return response
+
+
+def cache_shared_page(dependencies, timeout=None, per_host=False):
+    """Кеширует ответ view на GET-запросы, один для всех пользователей.
+
+    View рендерится без персональных фрагментов (см. тег
+    personal_fragment), они подставляются в ответ для каждого запроса.
+    dependencies(request, *args, **kwargs) возвращает зависимости,
+    известные до вызова view; остальные view добавляет в ответ через
+    add_dependencies(). per_host=True нужен view с абсолютными ссылками:
+    ответ кешируется отдельно для каждой пары схемы и хоста.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            def render():
+                versions = get_versions(
+                    dependencies(request, *args, **kwargs)
+                )
+                full_query = request.GET
+                request.GET = QueryDict(_page_query(request))
+                request.shared_render = True
+                try:
+                    response = view(request, *args, **kwargs)
+                finally:
+                    request.shared_render = False
+                    request.GET = full_query
+                if response.status_code == 200 and not response.streaming:
+                    late = set(getattr(response, 'cache_dependencies', ()))
+                    versions.update(get_versions(late - versions.keys()))
+                    response['Last-Modified'] = http_date()
+                return versions, response
+
+            versions, response = tiered_cache.fetch(
+                _page_key(request, per_host), render,
+                settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout,
+                is_fresh=is_fresh, cacheable=_is_cacheable,
+            )
+            if not _is_cacheable((versions, response)):
+                return _personalize(request, response)
+            response['ETag'] = _etag(request, versions, per_host)
+            response = get_conditional_response(
+                request, etag=response['ETag'],
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')
+                ),
+                response=response,
+            )
+            if response.status_code != 200:
+                # 304 или 412: тело не нужно, фрагменты не рендерятся.
+                return response
+            return _personalize(request, response)
+        return wrapper
+    return decorator
@@ -0,0 +1,319 @@
+"""Бэкенд кеша в файле SQLite, общий для всех процессов на машине.
+
+Файл открыт в режиме WAL, поэтому чтения не блокируют друг друга и
+запись. Каждая операция — одна транзакция, так что get_many() видит
+согласованный снимок, а set_many() записывает все ключи разом. Размер
+ограничен числом записей (MAX_ENTRIES) и суммарным объёмом значений
+(MAX_SIZE, байты); при превышении вытесняются давно не читанные записи.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 100000, 'MAX_SIZE': 256 * 2 ** 20},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed);
+CREATE TABLE IF NOT EXISTS cache_usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_usage VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_entry_insert AFTER INSERT ON cache_entry
+BEGIN
+    UPDATE cache_usage SET entries = entries + 1, size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entry_delete AFTER DELETE ON cache_entry
+BEGIN
+    UPDATE cache_usage SET entries = entries - 1, size = size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entry_update AFTER UPDATE OF size
+ON cache_entry
+BEGIN
+    UPDATE cache_usage SET size = size - OLD.size + NEW.size;
+END;
+"""
+
+# SQLite ограничивает число параметров в одном запросе.
+BATCH_SIZE = 500
+
+
+def _batches(items):
+    items = list(items)
+    for start in range(0, len(items), BATCH_SIZE):
+        yield items[start:start + BATCH_SIZE]
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        options = params.get('OPTIONS', {})
+        self._max_size = int(options.get('MAX_SIZE', 64 * 2 ** 20))
+        # Время последнего чтения обновляется не чаще раза в столько секунд,
+        # чтобы чтения почти никогда не становились записями.
+        self._lru_resolution = float(options.get('LRU_RESOLUTION', 1))
+        self._local = threading.local()
+
+    @property
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            # После fork() соединение родителя использовать нельзя.
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _connect(self):
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self._path, timeout=30, isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _transaction(self, immediate=False):
+        return _Transaction(self._connection, immediate)
+
+    def _fetch(self, connection, keys, now):
+        found = {}
+        stale = []
+        for batch in _batches(keys):
+            rows = connection.execute(
+                'SELECT key, value, expires, accessed FROM cache_entry '
+                f'WHERE key IN ({",".join("?" * len(batch))})', batch
+            )
+            for key, value, expires, accessed in rows:
+                if expires is not None and expires <= now:
+                    continue
+                found[key] = value
+                if accessed < now - self._lru_resolution:
+                    stale.append(key)
+        return found, stale
+
+    def _mark_accessed(self, keys, now):
+        if not keys:
+            return
+        try:
+            with self._transaction(immediate=True) as connection:
+                for batch in _batches(keys):
+                    connection.execute(
+                        'UPDATE cache_entry SET accessed = ? '
+                        f'WHERE key IN ({",".join("?" * len(batch))})',
+                        [now, *batch]
+                    )
+        except sqlite3.OperationalError:
+            # Если файл так и не освободился, отметку для LRU можно пропустить.
+            pass
+
+    def get_many(self, keys, version=None):
+        key_map = {}
+        for key in keys:
+            cache_key = self.make_key(key, version=version)
+            self.validate_key(cache_key)
+            key_map[cache_key] = key
+        if not key_map:
+            return {}
+        now = time.time()
+        with self._transaction() as connection:
+            found, stale = self._fetch(connection, key_map, now)
+        self._mark_accessed(stale, now)
+        return {
+            key_map[cache_key]: pickle.loads(value)
+            for cache_key, value in found.items()
+        }
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def has_key(self, key, version=None):
+        return bool(self.get_many([key], version=version))
+
+    def _write(self, connection, items, expires, now):
+        rows = []
+        for key, value in items:
+            data = pickle.dumps(value, self.pickle_protocol)
+            rows.append((key, data, len(data), expires, now))
+        # Не INSERT OR REPLACE: замена удаляет строку без триггера удаления
+        # (рекурсивные триггеры выключены), и cache_usage считал бы
+        # перезаписанный ключ дважды. Обновление ведёт триггер по size.
+        connection.executemany(
+            'INSERT INTO cache_entry '
+            '(key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+            'size = excluded.size, expires = excluded.expires, '
+            'accessed = excluded.accessed',
+            rows
+        )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = []
+        for key, value in data.items():
+            cache_key = self.make_key(key, version=version)
+            self.validate_key(cache_key)
+            items.append((cache_key, value))
+        if not items:
+            return []
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        with self._transaction(immediate=True) as connection:
+            if expires is not None and expires <= now:
+                self._delete(connection, [key for key, _ in items])
+            else:
+                self._write(connection, items, expires, now)
+                self._cull(connection, now)
+        return []
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+        now = time.time()
+        with self._transaction(immediate=True) as connection:
+            found, _ = self._fetch(connection, [cache_key], now)
+            if found:
+                return False
+            self._write(
+                connection, [(cache_key, value)],
+                self.get_backend_timeout(timeout), now
+            )
+            self._cull(connection, now)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+        now = time.time()
+        with self._transaction(immediate=True) as connection:
+            row = connection.execute(
+                'SELECT value, expires FROM cache_entry WHERE key = ?',
+                [cache_key]
+            ).fetchone()
+            if row is None or row[1] is not None and row[1] <= now:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            data = pickle.dumps(value, self.pickle_protocol)
+            connection.execute(
+                'UPDATE cache_entry SET value = ?, size = ?, accessed = ? '
+                'WHERE key = ?', [data, len(data), now, cache_key]
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+        now = time.time()
+        with self._transaction(immediate=True) as connection:
+            updated = connection.execute(
+                'UPDATE cache_entry SET expires = ?, accessed = ? '
+                'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                [self.get_backend_timeout(timeout), now, cache_key, now]
+            ).rowcount
+        return bool(updated)
+
+    def _delete(self, connection, keys):
+        deleted = 0
+        for batch in _batches(keys):
+            deleted += connection.execute(
+                'DELETE FROM cache_entry '
+                f'WHERE key IN ({",".join("?" * len(batch))})', batch
+            ).rowcount
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        cache_keys = [self.make_key(key, version=version) for key in keys]
+        for cache_key in cache_keys:
+            self.validate_key(cache_key)
+        with self._transaction(immediate=True) as connection:
+            self._delete(connection, cache_keys)
+
+    def delete(self, key, version=None):
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+        with self._transaction(immediate=True) as connection:
+            return bool(self._delete(connection, [cache_key]))
+
+    def clear(self):
+        with self._transaction(immediate=True) as connection:
+            connection.execute('DELETE FROM cache_entry')
+
+    def _cull(self, connection, now):
+        entries, size = connection.execute(
+            'SELECT entries, size FROM cache_usage'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        connection.execute(
+            'DELETE FROM cache_entry WHERE expires <= ?', [now]
+        )
+        entries, size = connection.execute(
+            'SELECT entries, size FROM cache_usage'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache_entry')
+            return
+        # Как и встроенные бэкенды, освобождаем сразу 1/CULL_FREQUENCY кеша,
+        # начиная с давно не читанных записей.
+        connection.execute(
+            'DELETE FROM cache_entry WHERE key IN ('
+            'SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)',
+            [max(entries // self._cull_frequency, 1)]
+        )
+        while connection.execute(
+                'SELECT entries > 0 AND size > ? FROM cache_usage',
+                [self._max_size]
+        ).fetchone()[0]:
+            connection.execute(
+                'DELETE FROM cache_entry WHERE key IN ('
+                'SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)',
+                [BATCH_SIZE]
+            )
+
+    def close(self, **kwargs):
+        # Соединение живёт вместе с потоком: открывать файл на каждый
+        # запрос дороже, чем держать его открытым.
+        pass
+
+
+class _Transaction:
+    def __init__(self, connection, immediate):
+        self.connection = connection
+        self.immediate = immediate
+
+    def __enter__(self):
+        self.connection.execute(
+            'BEGIN IMMEDIATE' if self.immediate else 'BEGIN'
+        )
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache_backends import SQLiteCache
+
+
+def _workload(cache, keys, batch, value):
+    """Запись и чтение всех ключей пачками.
+
+    Возвращает число операций и число ключей, которые не нашлись после
+    записи: их проверяет команда, а не assert, который снимает python -O.
+    """
+    operations = lost = 0
+    for start in range(0, len(keys), batch):
+        chunk = keys[start:start + batch]
+        cache.set_many({key: value for key in chunk})
+        operations += len(chunk)
+    for start in range(0, len(keys), batch):
+        chunk = keys[start:start + batch]
+        lost += len(chunk) - len(cache.get_many(chunk))
+        operations += len(chunk)
+    for key in keys:
+        cache.get(key)
+        operations += 1
+    return operations, lost
+
+
+def _run_worker(factory, keys, batch, value, results):
+    results.put(_workload(factory(), keys, batch, value))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость бэкенда SQLiteCache с locmem и файловым '
+        'кешем на одинаковой нагрузке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=5000)
+        parser.add_argument('--batch', type=int, default=20)
+        parser.add_argument('--value-size', type=int, default=2048)
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Сколько процессов одновременно гоняют нагрузку.'
+        )
+
+    def handle(self, *args, **options):
+        value = os.urandom(options['value_size'])
+        params = {'TIMEOUT': 300, 'OPTIONS': {'MAX_ENTRIES': 10 ** 7}}
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                'locmem': lambda: LocMemCache('benchmark', params),
+                'filebased': lambda: FileBasedCache(
+                    os.path.join(directory, 'files'), params
+                ),
+                'sqlite': lambda: SQLiteCache(
+                    os.path.join(directory, 'cache.sqlite3'), params
+                ),
+            }
+            for name, factory in backends.items():
+                self.report(name, factory, value, options)
+
+    def report(self, name, factory, value, options):
+        processes = options['processes']
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=_run_worker, args=(
+                factory,
+                [f'{number}:{key}' for key in range(options['keys'])],
+                options['batch'], value, results,
+            ))
+            for number in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        operations = lost = 0
+        for _ in workers:
+            done, missing = results.get()
+            operations += done
+            lost += missing
+        for worker in workers:
+            worker.join()
+        if lost:
+            raise CommandError(
+                f'{name}: после записи не нашлось ключей: {lost}.'
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name:>10}: {operations / elapsed:12.0f} оп/с '
+            f'({operations} операций за {elapsed:.2f} с, '
+            f'процессов: {processes})'
+        )
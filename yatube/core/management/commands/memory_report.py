@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import memory
+
+
+def _kib(size):
+    return f'{size / 1024:.1f} КиБ'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит сводки замеров памяти, которые процессы сайта положили '
+        'в кеш: пик и оставшуюся занятой память по имени URL, места '
+        'выделения и URL, у которых память растёт от запроса к запросу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести сводки в JSON.'
+        )
+        parser.add_argument(
+            '--top', type=int, default=3,
+            help='Сколько мест выделения показать для URL.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить сводки из кеша после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        summaries = memory.summaries()
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+        elif not summaries:
+            self.stdout.write('Замеров пока нет.')
+        else:
+            for summary in summaries:
+                self.report(summary, options['top'])
+        if options['reset']:
+            memory.reset()
+
+    def report(self, summary, top):
+        self.stdout.write(f'Процесс {summary["pid"]}:')
+        for url_name, view in summary['views'].items():
+            line = (
+                f'  {url_name}: замеров {view["requests"]}, пик '
+                f'{_kib(view["peak_max"])}, остаётся '
+                f'{_kib(view["retained_avg"])}'
+            )
+            if view['growing']:
+                line = self.style.WARNING(line + ' — растёт')
+            self.stdout.write(line)
+            for site, size in view['sites'][:top]:
+                self.stdout.write(f'    {site} {_kib(size)}')
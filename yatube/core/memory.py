@@ -0,0 +1,197 @@
+"""Память запросов по имени URL: пик и места, где она остаётся занятой.
+
+MemoryMiddleware включает tracemalloc для доли запросов
+MEMORY_TRACKING['SAMPLE_RATE'] и запоминает пик за запрос. Оставшуюся
+занятой память считает снимок, который снимается, когда ответ уже
+отдан: при входе следующего запроса в процесс. Иначе в неё попадал бы
+сам ответ. Сводка за последние WINDOW замеров копится в процессе и
+кладётся в кеш, откуда её читают страница admin/memory/ и команда
+memory_report. URL помечается как растущий, если каждый из последних
+WINDOW замеров оставил занятыми не меньше GROWTH_BYTES.
+
+tracemalloc общий для всех потоков, поэтому одновременно замеряется
+один запрос, а выделения соседних потоков тоже попадают в замер.
+"""
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY = 'core:memory'
+
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+_lock = threading.Lock()
+# Имя URL и пик памяти замеренного запроса, пока ждёт снимок.
+_pending = None
+_views = {}
+
+
+def config():
+    return {
+        'SAMPLE_RATE': 0.0,
+        'TOP': 10,
+        'WINDOW': 10,
+        'GROWTH_BYTES': 64 * 1024,
+        'TIMEOUT': 24 * 60 * 60,
+        **getattr(settings, 'MEMORY_TRACKING', {}),
+    }
+
+
+def _site(frame):
+    """Файл относительно проекта или каталога из sys.path и номер строки."""
+    filename = frame.filename
+    for directory in [settings.BASE_DIR, *sorted(sys.path, key=len)[::-1]]:
+        if directory and filename.startswith(directory + os.sep):
+            filename = os.path.relpath(filename, directory)
+            break
+    return f'{filename}:{frame.lineno}'
+
+
+class ViewMemory:
+    """Скользящая сводка замеров одного имени URL; размеры в байтах."""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.peak_max = 0
+        self.peaks = deque(maxlen=window)
+        self.retained = deque(maxlen=window)
+        self.sites = Counter()
+
+    def add(self, peak, retained, sites, top):
+        self.requests += 1
+        self.peak_max = max(self.peak_max, peak)
+        self.peaks.append(peak)
+        self.retained.append(retained)
+        self.sites.update(sites)
+        self.sites = Counter(dict(self.sites.most_common(top)))
+
+    def growing(self, threshold):
+        return (
+            len(self.retained) == self.retained.maxlen
+            and min(self.retained) >= threshold
+        )
+
+    def as_dict(self, options):
+        return {
+            'requests': self.requests,
+            'peak_max': self.peak_max,
+            'peak_avg': round(statistics.mean(self.peaks)),
+            'retained_avg': round(statistics.mean(self.retained)),
+            'retained_recent': list(self.retained),
+            'growing': self.growing(options['GROWTH_BYTES']),
+            'sites': self.sites.most_common(options['TOP']),
+        }
+
+
+def summary():
+    """Сводка этого процесса: растущие URL и самые тяжёлые первыми."""
+    options = config()
+    with _lock:
+        views = {
+            url_name: view.as_dict(options)
+            for url_name, view in _views.items()
+        }
+    return {
+        'pid': os.getpid(),
+        'updated': time.time(),
+        'growth_bytes': options['GROWTH_BYTES'],
+        'views': dict(sorted(views.items(), key=lambda item: (
+            not item[1]['growing'], -item[1]['retained_avg'],
+        ))),
+    }
+
+
+def _publish():
+    options = config()
+    pids = set(cache.get(f'{CACHE_KEY}:pids', ()))
+    pids.add(os.getpid())
+    cache.set_many({
+        f'{CACHE_KEY}:pids': pids,
+        f'{CACHE_KEY}:{os.getpid()}': summary(),
+    }, options['TIMEOUT'])
+
+
+def summaries():
+    """Сводки всех процессов, которые публиковали замеры в кеш."""
+    pids = cache.get(f'{CACHE_KEY}:pids', ())
+    found = cache.get_many([f'{CACHE_KEY}:{pid}' for pid in pids])
+    return sorted(found.values(), key=lambda item: item['pid'])
+
+
+def reset():
+    """Забывает замеры этого процесса и сводки всех процессов в кеше."""
+    pids = cache.get(f'{CACHE_KEY}:pids', ())
+    cache.delete_many(
+        [f'{CACHE_KEY}:pids'] + [f'{CACHE_KEY}:{pid}' for pid in pids]
+    )
+    with _lock:
+        _views.clear()
+
+
+def finish():
+    """Снимает отложенный снимок, если замер ждёт, и публикует сводку."""
+    global _pending
+    with _lock:
+        if _pending is None:
+            return False
+        url_name, peak = _pending
+        _pending = None
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        tracemalloc.stop()
+        options = config()
+        stats = snapshot.statistics('lineno')
+        sites = {
+            _site(stat.traceback[0]): stat.size
+            for stat in stats[:options['TOP']]
+        }
+        view = _views.setdefault(url_name, ViewMemory(options['WINDOW']))
+        view.add(
+            peak, sum(stat.size for stat in stats), sites, options['TOP']
+        )
+    _publish()
+    return True
+
+
+class MemoryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        global _pending
+        finish()
+        if random.random() >= config()['SAMPLE_RATE']:
+            return self.get_response(request)
+        with _lock:
+            # Идёт другой замер или tracemalloc включили снаружи.
+            if tracemalloc.is_tracing():
+                sampled = False
+            else:
+                tracemalloc.start()
+                sampled = True
+        if not sampled:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            tracemalloc.stop()
+            raise
+        match = request.resolver_match
+        with _lock:
+            _pending = (
+                match.view_name if match else 'unknown',
+                tracemalloc.get_traced_memory()[1],
+            )
+        return response
@@ -0,0 +1,50 @@
+"""Персональные фрагменты внутри общей закешированной страницы.
+
+Метка фрагмента подписана SECRET_KEY, а шаблон должен быть в
+PERSONAL_FRAGMENTS: stitch() проходит по всему телу ответа и не должен
+рендерить метки, которые написал пользователь, например в тексте поста.
+"""
+import base64
+import json
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.template.loader import render_to_string
+
+PLACEHOLDER_RE = re.compile(
+    r'<!--personal:([A-Za-z0-9_=-]+:[A-Za-z0-9_-]+)-->'
+)
+
+_signer = signing.Signer(salt='core.personal')
+
+
+def is_shared_render(request):
+    return getattr(request, 'shared_render', False)
+
+
+def placeholder(template_name, params):
+    if template_name not in settings.PERSONAL_FRAGMENTS:
+        raise ValueError(
+            f'Шаблона {template_name} нет в PERSONAL_FRAGMENTS.'
+        )
+    payload = json.dumps([template_name, params], separators=(',', ':'))
+    encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+    return f'<!--personal:{_signer.sign(encoded)}-->'
+
+
+def stitch(request, content):
+    """Подставляет в общую страницу фрагменты для request.user."""
+    def render_fragment(match):
+        try:
+            encoded = _signer.unsign(match.group(1))
+        except signing.BadSignature:
+            return match.group(0)
+        template_name, params = json.loads(
+            base64.urlsafe_b64decode(encoded.encode())
+        )
+        if template_name not in settings.PERSONAL_FRAGMENTS:
+            return match.group(0)
+        return render_to_string(template_name, params, request=request)
+
+    return PLACEHOLDER_RE.sub(render_fragment, content)
@@ -0,0 +1,224 @@
+"""Статистический профайлер для работающего процесса.
+
+Поток-сэмплер раз в INTERVAL секунд снимает стеки потоков через
+sys._current_frames() и считает одинаковые стеки. Учитываются только
+потоки, которые сейчас обрабатывают запрос (их отмечает
+ProfilerMiddleware), а стеки группируются по имени URL. Профайлер
+запускается на заданное число секунд со страницы для персонала или
+сигналом SIGNAL процессу; результат пишется в OUTPUT_DIR в двух видах:
+свёрнутые стеки для flamegraph.pl и JSON для speedscope.
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+FORMATS = {
+    'collapsed': '.collapsed.txt',
+    'speedscope': '.speedscope.json',
+}
+
+# Имя URL запроса, который обрабатывает поток, по идентификатору потока.
+_requests = {}
+
+
+def config():
+    return {
+        'INTERVAL': 0.005,
+        'DURATION': 10,
+        'MAX_DURATION': 120,
+        'OUTPUT_DIR': os.path.join(settings.BASE_DIR, 'profiles'),
+        'SIGNAL': 'SIGUSR2',
+        **getattr(settings, 'PROFILER', {}),
+    }
+
+
+def _frame_name(code):
+    # В свёрнутых стеках «;» разделяет кадры, а последний пробел — стек
+    # и число выборок.
+    name = f'{code.co_name} ({os.path.basename(code.co_filename)}:' \
+           f'{code.co_firstlineno})'
+    return name.replace(';', ',')
+
+
+class SamplingProfiler:
+    """Снимает стеки потоков запросов, пока не истечёт срок."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.reset()
+
+    def reset(self):
+        self.samples = Counter()
+        self.frames = {}
+        self.interval = 0.0
+        self.started = self.finished = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration, interval, on_finish=None):
+        """Запускает сэмплер; False, если он уже работает."""
+        with self.lock:
+            if self.running:
+                return False
+            self.reset()
+            self.interval = interval
+            self.thread = threading.Thread(
+                target=self._run, args=(duration, on_finish),
+                name='sampling-profiler', daemon=True,
+            )
+            self.thread.start()
+            return True
+
+    def _run(self, duration, on_finish):
+        self.started = time.time()
+        deadline = time.perf_counter() + duration
+        own = threading.get_ident()
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for ident, url_name in list(_requests.items()):
+                frame = frames.get(ident)
+                if frame is not None and ident != own:
+                    self.samples[url_name, self._stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+        self.finished = time.time()
+        if on_finish is not None:
+            on_finish(self)
+
+    def _stack(self, frame):
+        """Ключи кадров от корня к листу."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if code not in self.frames:
+                self.frames[code] = _frame_name(code)
+            stack.append(code)
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def collapsed(self):
+        """Строки «url;кадр;кадр число» для flamegraph.pl и speedscope."""
+        lines = []
+        for (url_name, stack), count in sorted(
+            self.samples.items(), key=lambda item: -item[1]
+        ):
+            names = [url_name or 'unknown']
+            names.extend(self.frames[code] for code in stack)
+            lines.append(f'{";".join(names)} {count}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def speedscope(self):
+        """Профиль в формате speedscope, по профилю на имя URL."""
+        index = {code: number for number, code in enumerate(self.frames)}
+        by_url = {}
+        for (url_name, stack), count in self.samples.items():
+            profile = by_url.setdefault(url_name or 'unknown', {
+                'type': 'sampled',
+                'name': url_name or 'unknown',
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': 0,
+                'samples': [],
+                'weights': [],
+            })
+            weight = count * self.interval
+            profile['samples'].append([index[code] for code in stack])
+            profile['weights'].append(weight)
+            profile['endValue'] += weight
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': f'yatube {os.getpid()}',
+            'exporter': 'core.profiler',
+            'shared': {'frames': [
+                {
+                    'name': code.co_name,
+                    'file': code.co_filename,
+                    'line': code.co_firstlineno,
+                }
+                for code in self.frames
+            ]},
+            'profiles': sorted(
+                by_url.values(), key=lambda profile: -profile['endValue']
+            ),
+        }
+
+    def save(self, directory):
+        """Пишет оба формата в directory, возвращает имена файлов."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(self.started))
+        base = f'{stamp}-{os.getpid()}'
+        contents = {
+            'collapsed': self.collapsed(),
+            'speedscope': json.dumps(self.speedscope()),
+        }
+        names = []
+        for name, suffix in FORMATS.items():
+            path = os.path.join(directory, base + suffix)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(contents[name])
+            names.append(base + suffix)
+        return names
+
+
+profiler = SamplingProfiler()
+
+
+def start(duration=None, interval=None):
+    """Профилирует этот процесс duration секунд и сохраняет результат."""
+    options = config()
+    duration = min(duration or options['DURATION'], options['MAX_DURATION'])
+    return profiler.start(
+        duration, interval or options['INTERVAL'],
+        on_finish=lambda finished: finished.save(options['OUTPUT_DIR']),
+    )
+
+
+def saved_profiles():
+    """Имена сохранённых профилей, новые первыми."""
+    directory = config()['OUTPUT_DIR']
+    if not os.path.isdir(directory):
+        return []
+    return sorted((
+        name for name in os.listdir(directory)
+        if name.endswith(tuple(FORMATS.values()))
+    ), reverse=True)
+
+
+def install_signal_handler():
+    """Запуск профайлера сигналом: kill -USR2 <pid> на DURATION секунд."""
+    name = config()['SIGNAL']
+    signum = getattr(signal, name, None) if name else None
+    if signum is None or threading.current_thread() is not \
+            threading.main_thread():
+        return False
+    signal.signal(signum, lambda received, frame: start())
+    return True
+
+
+class ProfilerMiddleware:
+    """Отмечает, какой URL обрабатывает поток, пока работает профайлер."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            _requests.pop(threading.get_ident(), None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if profiler.running:
+            _requests[threading.get_ident()] = (
+                request.resolver_match.view_name
+            )
@@ -0,0 +1,170 @@
+"""Кеш результатов QuerySet.get() с версиями таблиц и строк.
+
+Group.objects.cached().get(slug=...) кладёт найденный объект в кеш вместе
+с версиями таблиц, из которых он прочитан (core.cache.get_versions).
+Поиск по первичному ключу зависит от версии строки и версии всех строк
+таблицы, остальные — от версии таблицы. Сохранение и удаление
+зарегистрированных моделей меняют версии строки и таблицы, массовые
+операции CachedQuerySet, которые не знают затронутых строк, — версии
+таблицы и всех её строк.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.models.signals import post_delete, post_save
+
+from core.cache import bump, get_versions, is_fresh
+from core.tiered import tiered_cache
+
+_lock = threading.Lock()
+_stats = Counter()
+
+
+def table_version(table):
+    return f'table:{table}'
+
+
+def row_version(table, pk):
+    return f'row:{table}:{pk}'
+
+
+def rows_version(table):
+    return f'rows:{table}'
+
+
+def invalidate_table(model):
+    """Сбрасывает все запросы к таблице, включая поиск по ключу."""
+    table = model._meta.db_table
+    bump(table_version(table), rows_version(table))
+
+
+def invalidate_row(model, pk):
+    table = model._meta.db_table
+    bump(table_version(table), row_version(table, pk))
+
+
+def _record(model, outcome):
+    with _lock:
+        _stats[model._meta.label, outcome] += 1
+
+
+def stats():
+    """Попадания и промахи кеша запросов по моделям в этом процессе."""
+    with _lock:
+        snapshot = dict(_stats)
+    result = {}
+    for (label, outcome), total in snapshot.items():
+        result.setdefault(label, {'hits': 0, 'misses': 0})[outcome] = total
+    return result
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+class CachedQuerySet(models.QuerySet):
+    """QuerySet, чей get() можно закешировать вызовом cached()."""
+
+    _query_cache_timeout = None
+
+    def cached(self, timeout=None):
+        clone = self._chain()
+        clone._query_cache_timeout = (
+            settings.QUERY_CACHE_TIMEOUT if timeout is None else timeout
+        )
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._query_cache_timeout = self._query_cache_timeout
+        return clone
+
+    def _dependencies(self, queryset, args, kwargs):
+        base = self.model._meta.db_table
+        tables = {
+            join.table_name for join in queryset.query.alias_map.values()
+        }
+        names = {table_version(table) for table in tables - {base}}
+        pk_names = {'pk', self.model._meta.pk.attname}
+        if not args and len(kwargs) == 1 and pk_names.issuperset(kwargs):
+            names.add(row_version(base, next(iter(kwargs.values()))))
+            names.add(rows_version(base))
+        else:
+            names.add(table_version(base))
+        return names
+
+    def get(self, *args, **kwargs):
+        if self._query_cache_timeout is None:
+            return super().get(*args, **kwargs)
+        queryset = self.filter(*args, **kwargs)
+        sql, params = queryset.query.sql_with_params()
+        database = connections[self.db].settings_dict['NAME']
+        digest = hashlib.md5(
+            f'{self.db}:{database}:{sql}:{params!r}'.encode()
+        )
+        key = f'query:{self.model._meta.label}:{digest.hexdigest()}'
+        hit = True
+
+        def run_query():
+            nonlocal hit
+            hit = False
+            versions = get_versions(
+                self._dependencies(queryset, args, kwargs)
+            )
+            try:
+                return versions, super(CachedQuerySet, self).get(
+                    *args, **kwargs
+                )
+            except self.model.DoesNotExist:
+                return versions, None
+
+        _, result = tiered_cache.fetch(
+            key, run_query, self._query_cache_timeout, is_fresh=is_fresh
+        )
+        _record(self.model, 'hits' if hit else 'misses')
+        if result is None:
+            raise self.model.DoesNotExist(
+                f'{self.model._meta.object_name} matching query '
+                'does not exist.'
+            )
+        return result
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_table(self.model)
+        return rows
+
+    def delete(self):
+        result = super().delete()
+        invalidate_table(self.model)
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_table(self.model)
+        return objs
+
+
+def cached(model, timeout=None):
+    """Кешируемый QuerySet для модели со сторонним менеджером (User)."""
+    return CachedQuerySet(model).cached(timeout)
+
+
+def _invalidate_instance(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_row(sender, instance.pk)
+
+
+def register(*models_to_watch):
+    """Сбрасывает кеш запросов при сохранении и удалении моделей."""
+    for model in models_to_watch:
+        post_save.connect(_invalidate_instance, sender=model,
+                          dispatch_uid=f'querycache:save:{model._meta.label}')
+        post_delete.connect(
+            _invalidate_instance, sender=model,
+            dispatch_uid=f'querycache:delete:{model._meta.label}'
+        )
@@ -0,0 +1,97 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from core.cache import get_versions
+
+register = template.Library()
+
+
+def _dependencies(item):
+    """Зависимости кеша страниц, от которых зависит фрагмент item."""
+    names = getattr(item, 'fragment_dependencies', None)
+    return names() if names is not None else ()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, item, sequence, nodelist):
+        self.item = item
+        self.sequence = sequence
+        self.nodelist = nodelist
+
+    def key_for(self, item, versions):
+        updated = item.updated.isoformat() if item.updated else ''
+        digest = hashlib.md5()
+        for name in sorted(_dependencies(item)):
+            digest.update(f'{name}={versions[name]};'.encode())
+        return (
+            f'fragment:{self.origin.template_name}:{self.token.lineno}:'
+            f'{get_language()}:{item.pk}:{updated}:{digest.hexdigest()}'
+        )
+
+    def prefetch(self, context):
+        """Читает версии зависимостей и фрагменты всей последовательности:
+        по одному get_many() на то и другое."""
+        items = list(
+            self.sequence.resolve(context, ignore_failures=True) or ()
+        )
+        versions = get_versions(
+            {name for item in items for name in _dependencies(item)}
+        )
+        keys = {self.key_for(item, versions) for item in items}
+        return {
+            'versions': versions,
+            'cached': cache.get_many(keys),
+            'remaining': keys,
+            'rendered': {},
+        }
+
+    def render(self, context):
+        item = self.item.resolve(context)
+        state = context.render_context.get(self)
+        if state is None:
+            state = context.render_context[self] = self.prefetch(context)
+        versions = state['versions']
+        missing = set(_dependencies(item)) - versions.keys()
+        if missing:
+            versions.update(get_versions(missing))
+        key = self.key_for(item, versions)
+        fragment = state['cached'].get(key)
+        if fragment is None:
+            fragment = state['rendered'][key] = self.nodelist.render(context)
+        state['remaining'].discard(key)
+        if not state['remaining'] and state['rendered']:
+            cache.set_many(state['rendered'], settings.FRAGMENT_CACHE_TIMEOUT)
+            state['rendered'] = {}
+        return mark_safe(fragment)
+
+
+@register.tag
+def cache_fragment(parser, token):
+    """Кеширует тело блока для объекта item из последовательности sequence.
+
+    {% for post in page_obj %}
+      {% cache_fragment post in page_obj %}...{% endcache_fragment %}
+    {% endfor %}
+
+    Ключ фрагмента — (pk, updated) объекта и версии зависимостей из его
+    fragment_dependencies(), так что изменённый объект, как и его
+    изменённые автор или группа, рендерится заново. При первом вызове
+    версии и фрагменты всей sequence читаются из кеша двумя get_many(),
+    новые фрагменты записываются одним set_many().
+    """
+    bits = token.split_contents()
+    if len(bits) != 4 or bits[2] != 'in':
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' ожидает синтаксис: {bits[0]} item in sequence"
+        )
+    nodelist = parser.parse(('endcache_fragment',))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        parser.compile_filter(bits[1]), parser.compile_filter(bits[3]),
+        nodelist
+    )
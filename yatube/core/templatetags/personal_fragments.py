@@ -0,0 +1,20 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core import personal
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def personal_fragment(context, template_name, **params):
+    """Вставляет фрагмент, который зависит от текущего пользователя.
+
+    При рендере общей для всех страницы вместо фрагмента остаётся метка,
+    которую core.personal.stitch() заменяет для каждого запроса.
+    """
+    request = context.get('request')
+    if personal.is_shared_render(request):
+        return mark_safe(personal.placeholder(template_name, params))
+    return render_to_string(template_name, params, request=request)
@@ -0,0 +1,57 @@
+"""Бюджет запросов к базе для тестов представлений.
+
+Бюджет ограничивает и число запросов, и число повторов: запросов,
+которые отличаются только значениями параметров. Повторы — признак
+N+1, например шаблона, который в цикле читает post.group.title.
+"""
+import re
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+QueryBudget = namedtuple('QueryBudget', ('queries', 'duplicates'))
+QueryBudget.__new__.__defaults__ = (0,)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r'\((?:\?, )*\?\)')
+
+
+def query_shape(sql):
+    """SQL без значений параметров: IN (1, 2, 3) и IN (4) совпадают."""
+    return _LISTS.sub('(?)', _LITERALS.sub('?', sql))
+
+
+def duplicates(queries):
+    """Число запросов, повторяющих форму уже выполненного запроса."""
+    shapes = Counter(query_shape(query['sql']) for query in queries)
+    return sum(count - 1 for count in shapes.values())
+
+
+def budget_report(queries):
+    """Список запросов, где повторы помечены числом выполнений."""
+    shapes = Counter(query_shape(query['sql']) for query in queries)
+    lines = []
+    for number, query in enumerate(queries, start=1):
+        repeats = shapes[query_shape(query['sql'])]
+        mark = f' [x{repeats}]' if repeats > 1 else ''
+        lines.append(f'{number}.{mark} {query["sql"]}')
+    return '\n'.join(lines)
+
+
+class QueryBudgetMixin:
+    """Проверки бюджета запросов для django.test.TestCase."""
+
+    @contextmanager
+    def assertQueryBudget(self, budget, msg=''):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = context.captured_queries
+        repeated = duplicates(queries)
+        if len(queries) > budget.queries or repeated > budget.duplicates:
+            self.fail(
+                f'{msg}: {len(queries)} запросов при бюджете '
+                f'{budget.queries}, повторов {repeated} при бюджете '
+                f'{budget.duplicates}:\n{budget_report(queries)}'
+            )
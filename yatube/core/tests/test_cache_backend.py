@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from ..cache_backends import SQLiteCache
+from ..management.commands import cache_benchmark
+
+
+def _write_from_child(location):
+    SQLiteCache(location, {}).set_many({'shared': 'из другого процесса'})
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.location, {'OPTIONS': options})
+
+    def test_get_set_many(self):
+        """set_many/get_many сохраняют и читают значения любых типов."""
+        self.cache.set_many({'a': 1, 'b': [1, 2], 'c': {'x': 'текст'}})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c', 'missing']),
+            {'a': 1, 'b': [1, 2], 'c': {'x': 'текст'}}
+        )
+        self.assertIsNone(self.cache.get('missing'))
+        self.cache.delete('a')
+        self.assertFalse(self.cache.has_key('a'))
+
+    def test_expired_values_are_missing(self):
+        """Значение с истёкшим сроком не возвращается."""
+        self.cache.set('short', 'значение', timeout=0.05)
+        self.cache.set('forever', 'значение', timeout=None)
+        time.sleep(0.1)
+        self.assertEqual(self.cache.get_many(['short', 'forever']),
+                         {'forever': 'значение'})
+        self.assertTrue(self.cache.add('short', 'новое'))
+        self.assertFalse(self.cache.add('short', 'ещё новее'))
+        self.assertEqual(self.cache.get('short'), 'новое')
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_lru_eviction_by_entries(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        cache = self.make_cache(
+            MAX_ENTRIES=4, CULL_FREQUENCY=2, LRU_RESOLUTION=0
+        )
+        cache.set_many({'k1': 1, 'k2': 2, 'k3': 3, 'k4': 4})
+        cache.get_many(['k1', 'k2'])
+        cache.set('k5', 5)
+        self.assertEqual(
+            sorted(cache.get_many(['k1', 'k2', 'k3', 'k4', 'k5'])),
+            ['k1', 'k2', 'k5']
+        )
+
+    def test_size_cap(self):
+        """Суммарный объём значений не превышает MAX_SIZE."""
+        cache = self.make_cache(MAX_SIZE=10000)
+        for number in range(20):
+            cache.set(f'k{number}', os.urandom(1000))
+        self.assertLessEqual(
+            sum(len(value) for value in cache.get_many(
+                [f'k{number}' for number in range(20)]).values()),
+            10000
+        )
+        self.assertIsNotNone(cache.get('k19'))
+
+    def test_overwrites_keep_usage_totals(self):
+        """Перезапись ключа не раздувает учёт числа и объёма записей."""
+        cache = self.make_cache(MAX_SIZE=20000)
+        for number in range(50):
+            cache.set('k', os.urandom(1000 + number))
+        cache.set_many({'k': b'x', 'other': b'y'})
+        cache.add('k', b'z')
+        usage = cache._connection.execute(
+            'SELECT entries, size FROM cache_usage'
+        ).fetchone()
+        actual = cache._connection.execute(
+            'SELECT COUNT(*), SUM(size) FROM cache_entry'
+        ).fetchone()
+        self.assertEqual(usage, actual)
+        self.assertEqual(usage[0], 2)
+        cache.set('big', os.urandom(1000))
+        self.assertIsNotNone(cache.get('big'))
+
+    def test_shared_between_processes(self):
+        """Запись из другого процесса видна сразу."""
+        self.cache.get('warm-up')
+        process = multiprocessing.get_context('fork').Process(
+            target=_write_from_child, args=(self.location,)
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get('shared'), 'из другого процесса')
+
+    def test_benchmark_reports_lost_keys(self):
+        """Бенчмарк падает с CommandError, если кеш теряет записи."""
+        command = cache_benchmark.Command(stdout=StringIO())
+        options = {'processes': 1, 'keys': 10, 'batch': 5}
+        command.report('sqlite', self.make_cache, b'x', options)
+        with self.assertRaises(CommandError):
+            command.report(
+                'dummy', lambda: DummyCache('dummy', {}), b'x', options
+            )
@@ -0,0 +1,91 @@
+import tracemalloc
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from .. import memory
+
+User = get_user_model()
+
+leaked = []
+
+
+def leaky_view(request):
+    leaked.append(bytearray(100 * 1024))
+    return HttpResponse()
+
+
+def clean_view(request):
+    HttpResponse(bytearray(100 * 1024))
+    return HttpResponse()
+
+
+@override_settings(MEMORY_TRACKING={
+    'SAMPLE_RATE': 1.0, 'TOP': 5, 'WINDOW': 3, 'GROWTH_BYTES': 50 * 1024,
+})
+class MemoryMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        memory.reset()
+        self.addCleanup(memory.reset)
+        self.addCleanup(memory.finish)
+        self.addCleanup(leaked.clear)
+
+    def measure(self, view, path, times):
+        middleware = memory.MemoryMiddleware(view)
+        for _ in range(times):
+            request = RequestFactory().get(path)
+            request.resolver_match = resolve(path)
+            middleware(request)
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertTrue(memory.finish())
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_growing_view_is_flagged(self):
+        """Растущим считается только URL, после которого память остаётся
+        занятой в каждом замере окна."""
+        self.measure(leaky_view, reverse('posts:index'), 3)
+        self.measure(clean_view, reverse('posts:search'), 3)
+        [summary] = memory.summaries()
+        leaking = summary['views']['posts:index']
+        self.assertEqual(leaking['requests'], 3)
+        self.assertTrue(leaking['growing'])
+        self.assertGreaterEqual(leaking['retained_avg'], 100 * 1024)
+        sites = {
+            site.rpartition(':')[0]: size for site, size in leaking['sites']
+        }
+        self.assertGreaterEqual(sites['core/tests/test_memory.py'], 300 * 1024)
+        clean = summary['views']['posts:search']
+        self.assertFalse(clean['growing'])
+        self.assertGreaterEqual(clean['peak_max'], 100 * 1024)
+        self.assertLess(clean['retained_avg'], 50 * 1024)
+        self.assertEqual(list(summary['views']), [
+            'posts:index', 'posts:search',
+        ])
+
+    def test_window_must_fill_before_flagging(self):
+        """До WINDOW замеров рост не отмечается."""
+        self.measure(leaky_view, reverse('posts:index'), 2)
+        [summary] = memory.summaries()
+        self.assertFalse(summary['views']['posts:index']['growing'])
+
+    def test_staff_page_and_command(self):
+        """Сводка запросов сайта видна персоналу и в команде."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('about:author'))
+        url = reverse('core:memory')
+        user = User.objects.create_user(username='auth')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        user.is_staff = True
+        user.save()
+        self.assertContains(self.client.get(url), 'posts:index')
+        out = StringIO()
+        call_command('memory_report', '--reset', stdout=out)
+        self.assertIn('posts:index: замеров 1', out.getvalue())
+        self.assertEqual(memory.summaries(), [])
@@ -0,0 +1,105 @@
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import profiler
+
+User = get_user_model()
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+class SamplingProfilerTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.settings = override_settings(PROFILER={
+            'INTERVAL': 0.001, 'DURATION': 0.1, 'MAX_DURATION': 1,
+            'OUTPUT_DIR': self.directory, 'SIGNAL': 'SIGUSR2',
+        })
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def wait(self):
+        if profiler.profiler.thread is not None:
+            profiler.profiler.thread.join()
+
+    def profile_request(self, url_name):
+        """Профилирует поток, который будто бы обрабатывает url_name."""
+        stop = threading.Event()
+        worker = threading.Thread(target=spin, args=(stop,))
+        worker.start()
+        profiler._requests[worker.ident] = url_name
+        try:
+            self.assertTrue(profiler.start())
+            self.assertFalse(profiler.start())
+            self.wait()
+        finally:
+            stop.set()
+            worker.join()
+            profiler._requests.pop(worker.ident, None)
+        return profiler.profiler
+
+    def test_stacks_are_grouped_by_url_name(self):
+        """Стеки потоков запросов собираются по имени URL в оба формата."""
+        result = self.profile_request('posts:index')
+        lines = result.collapsed().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertTrue(stack.startswith('posts:index;'))
+        self.assertIn('spin (test_profiler.py:', stack)
+        self.assertGreater(int(count), 0)
+        speedscope = result.speedscope()
+        [profile] = speedscope['profiles']
+        self.assertEqual(profile['name'], 'posts:index')
+        self.assertEqual(len(profile['samples']), len(profile['weights']))
+        frames = speedscope['shared']['frames']
+        self.assertIn('spin', {frame['name'] for frame in frames})
+        self.assertEqual(len(profiler.saved_profiles()), 2)
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR2'), 'нужен SIGUSR2')
+    def test_signal_starts_profiler(self):
+        """Сигнал запускает профайлер, результат сохраняется в файлы."""
+        previous = signal.getsignal(signal.SIGUSR2)
+        self.addCleanup(signal.signal, signal.SIGUSR2, previous)
+        self.assertTrue(profiler.install_signal_handler())
+        os.kill(os.getpid(), signal.SIGUSR2)
+        time.sleep(0.01)
+        self.wait()
+        self.assertEqual(len(profiler.saved_profiles()), 2)
+
+    def test_staff_page(self):
+        """Страница доступна только персоналу, запускает профайлер и
+        отдаёт сохранённые профили."""
+        url = reverse('core:profiler')
+        user = User.objects.create_user(username='auth')
+        self.client.force_login(user)
+        self.assertEqual(self.client.post(url).status_code, 302)
+        self.assertFalse(profiler.profiler.running)
+        user.is_staff = True
+        user.save()
+        response = self.client.post(url, {'seconds': 1, 'interval': 1})
+        self.assertRedirects(response, url)
+        self.wait()
+        [collapsed, _] = sorted(profiler.saved_profiles())
+        self.assertContains(self.client.get(url), collapsed)
+        response = self.client.get(
+            reverse('core:profile_download', args=[collapsed])
+        )
+        self.assertIn('attachment', response['Content-Disposition'])
+        response = self.client.get(
+            reverse('core:profile_download', args=['settings.py'])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(profiler._requests, {})
@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from about import urls as about_urls
+from posts import urls as posts_urls
+from posts.models import Group, Post
+from users import urls as users_urls
+
+from ..testing import QueryBudget, QueryBudgetMixin, query_shape
+
+User = get_user_model()
+
+# Страницы с пустым кешем: (запросов, повторов) на имя URL. Бюджет один
+# для малого и большого набора данных, так что запросы в цикле по
+# постам, авторам или группам его превысят.
+QUERY_BUDGETS = {
+    'posts:index': QueryBudget(1),
+    'posts:group_posts': QueryBudget(2),
+    'posts:profile': QueryBudget(2),
+    'posts:post_detail': QueryBudget(1),
+    'posts:tag_posts': QueryBudget(2),
+    'posts:search': QueryBudget(1),
+    'posts:index_rss': QueryBudget(1),
+    'posts:index_atom': QueryBudget(1),
+    'posts:group_rss': QueryBudget(2),
+    'posts:group_atom': QueryBudget(2),
+    'posts:profile_rss': QueryBudget(2),
+    'posts:profile_atom': QueryBudget(2),
+    'posts:post_create': QueryBudget(4),
+    'posts:post_edit': QueryBudget(4),
+    'users:signup': QueryBudget(0),
+    'users:login': QueryBudget(0),
+    'users:logout': QueryBudget(4),
+    'users:passwordchange': QueryBudget(2),
+    'users:passwordchangedone': QueryBudget(2),
+    'about:author': QueryBudget(0),
+    'about:tech': QueryBudget(0),
+}
+
+# Страницы, которые открываются только после входа.
+AUTHENTICATED = frozenset((
+    'posts:post_create', 'posts:post_edit', 'users:logout',
+    'users:passwordchange', 'users:passwordchangedone',
+))
+
+# Посты в малом и большом наборе: неполная страница и несколько полных.
+DATASET_SIZES = (3, 35)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+        self.authors = [self.author] + [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(9)
+        ]
+        self.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description='Описание'
+            )
+            for number in range(5)
+        ]
+
+    def fill(self, size):
+        """Дополняет посты до size, у соседних — разные авторы и группы."""
+        for number in range(Post.objects.count(), size):
+            Post.objects.create(
+                author=self.authors[number % len(self.authors)],
+                group=self.groups[number % len(self.groups)],
+                text=f'Пост {number} #тег',
+            )
+
+    def urls(self):
+        post = Post.objects.filter(author=self.author).first()
+        values = {
+            'slug': self.groups[0].slug,
+            'username': self.author.username,
+            'post_id': post.pk,
+            'name': 'тег',
+        }
+        query = {'posts:search': {'q': 'пост'}}
+        for module in (posts_urls, users_urls, about_urls):
+            for pattern in module.urlpatterns:
+                name = f'{module.app_name}:{pattern.name}'
+                kwargs = {
+                    key: values[key] for key in pattern.pattern.converters
+                }
+                yield name, reverse(name, kwargs=kwargs), query.get(name)
+
+    def test_every_url_has_a_budget(self):
+        """У каждой страницы posts, users и about есть бюджет запросов."""
+        self.fill(1)
+        names = {name for name, _, _ in self.urls()}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    def test_views_stay_within_budget(self):
+        """Число запросов не растёт с размером страницы и данных."""
+        for size in DATASET_SIZES:
+            self.fill(size)
+            for name, url, data in self.urls():
+                with self.subTest(url=name, posts=size):
+                    cache.clear()
+                    client = Client()
+                    if name in AUTHENTICATED:
+                        client.force_login(self.author)
+                    with self.assertQueryBudget(
+                        QUERY_BUDGETS[name], f'{name} при {size} постах'
+                    ):
+                        response = client.get(url, data)
+                    self.assertLess(response.status_code, 400)
+
+
+class QueryBudgetMixinTests(QueryBudgetMixin, TestCase):
+    def test_repeated_queries_are_reported(self):
+        """Запросы в цикле считаются повторами и попадают в сообщение."""
+        author = User.objects.create_user(username='auth')
+        for number in range(3):
+            group = Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description='Описание'
+            )
+            Post.objects.create(author=author, group=group, text='Пост')
+        with self.assertRaisesMessage(AssertionError, '[x3]'):
+            with self.assertQueryBudget(QueryBudget(4), 'цикл'):
+                [post.group.title for post in Post.objects.all()]
+        with self.assertQueryBudget(QueryBudget(1), 'select_related'):
+            [
+                post.group.title
+                for post in Post.objects.select_related('group')
+            ]
+
+    def test_query_shape_ignores_values(self):
+        """Форма запроса не зависит от значений и длины списка IN."""
+        self.assertEqual(
+            query_shape("SELECT 1 FROM t WHERE a = 'x' AND id IN (1, 2)"),
+            query_shape("SELECT 2 FROM t WHERE a = 'y' AND id IN (7)"),
+        )
@@ -0,0 +1,135 @@
+import threading
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from ..tiered import TieredCache
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache('tiered-tests', {})
+        self.shared.clear()
+        self.tiered = self.make_tiered()
+
+    def make_tiered(self, **kwargs):
+        kwargs.setdefault('beta', 0)
+        return TieredCache(
+            self.shared, local_max_entries=2, lock_timeout=2, **kwargs
+        )
+
+    def slow(self, value):
+        def compute():
+            time.sleep(0.01)
+            return value
+        return compute
+
+    def test_hits_are_counted_per_tier(self):
+        """Первое чтение — промах, затем попадание в память процесса."""
+        for _ in range(2):
+            self.assertEqual(self.tiered.fetch('key', lambda: 1, 60), 1)
+        other = self.make_tiered()
+        self.assertEqual(other.fetch('key', lambda: 2, 60), 1)
+        self.assertEqual(self.tiered.stats(), {'misses': 1, 'local_hits': 1})
+        self.assertEqual(other.stats(), {'shared_hits': 1})
+
+    def test_local_values_are_copies(self):
+        """Изменение полученного значения не портит закешированное."""
+        self.tiered.fetch('key', lambda: ['значение'], 60).append('мусор')
+        self.assertEqual(
+            self.tiered.fetch('key', list, 60), ['значение']
+        )
+
+    def test_stale_and_uncacheable_values_are_recomputed(self):
+        """Несвежее значение пересчитывается, некешируемое не сохраняется."""
+        self.tiered.fetch('key', lambda: 1, 60)
+        self.assertEqual(
+            self.tiered.fetch('key', lambda: 2, 60, is_fresh=lambda v: v > 1),
+            2
+        )
+        self.tiered.fetch('skip', lambda: 3, 60, cacheable=lambda v: False)
+        self.assertIsNone(self.shared.get('skip'))
+
+    def test_local_tier_is_bounded(self):
+        """Локальный уровень вытесняет давно не читанные ключи."""
+        for key in ('a', 'b', 'c'):
+            self.tiered.fetch(key, lambda: key, 60)
+        self.assertIsNone(self.tiered.local.get('a'))
+        self.assertEqual(self.tiered.fetch('a', lambda: 'новое', 60), 'a')
+        self.assertEqual(self.tiered.stats()['shared_hits'], 1)
+
+    def test_concurrent_misses_are_coalesced(self):
+        """Одновременные промахи ждут одно вычисление."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'страница'
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.tiered.fetch('hot', compute, 60)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['страница'] * 5)
+        self.assertEqual(self.tiered.stats()['coalesced_waits'], 4)
+
+    def test_other_process_computing_is_awaited(self):
+        """Пока ключ считает другой процесс, значение ждут из общего кеша."""
+        self.shared.add('lock:hot', 'другой процесс', 2)
+        timer = threading.Timer(0.1, lambda: self.shared.set(
+            'hot', ('чужое', time.time() + 60, 0.1), 60
+        ))
+        timer.start()
+        self.assertEqual(self.tiered.fetch('hot', lambda: 'своё', 60), 'чужое')
+        timer.join()
+        self.assertEqual(self.tiered.stats(), {'coalesced_waits': 1})
+
+    def test_released_lock_without_value_stops_waiting(self):
+        """Если другой процесс снял блокировку, не сохранив значение
+        (ответ не кешируется или вычисление упало), ждать срок не нужно."""
+        self.shared.add('lock:missing', 'другой процесс', 2)
+        timer = threading.Timer(
+            0.1, lambda: self.shared.delete('lock:missing')
+        )
+        timer.start()
+        started = time.time()
+        self.assertEqual(self.tiered.fetch('missing', lambda: 404, 60), 404)
+        timer.join()
+        self.assertLess(time.time() - started, 1)
+        self.assertEqual(self.tiered.stats(), {'misses': 1})
+
+    def test_values_are_refreshed_before_expiry(self):
+        """С большим beta значение пересчитывается до истечения срока."""
+        eager = self.make_tiered(beta=10 ** 9)
+        eager.fetch('key', self.slow(1), 60)
+        self.assertEqual(eager.fetch('key', lambda: 2, 60), 2)
+        self.assertEqual(eager.stats()['early_refreshes'], 1)
+
+    def test_early_refresh_in_progress_serves_current_value(self):
+        """Пока другой процесс обновляет ключ заранее, отдаётся текущее."""
+        eager = self.make_tiered(beta=10 ** 9)
+        eager.fetch('key', self.slow(1), 60)
+        self.shared.add('lock:key', 'другой процесс', 2)
+        self.assertEqual(eager.fetch('key', lambda: 2, 60), 1)
+
+    def test_nested_fetches_do_not_block(self):
+        """Значение можно вычислять через кеш другого ключа."""
+        for number in range(100):
+            value = self.tiered.fetch(
+                f'page:{number}',
+                lambda: self.tiered.fetch(f'query:{number}', lambda: 1, 60),
+                60
+            )
+            self.assertEqual(value, 1)
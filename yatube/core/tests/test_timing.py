@@ -0,0 +1,80 @@
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def timings(header):
+    """{'sql': (мс, описание), ...} из заголовка Server-Timing."""
+    result = {}
+    for metric in header.split(', '):
+        name, dur, *desc = metric.split(';')
+        result[name] = (float(dur[len('dur='):]), ''.join(desc))
+    return result
+
+
+@override_settings(SERVER_TIMING={'SAMPLE_RATE': 1.0, 'HEADER': True})
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_header_and_log_split_request_time(self):
+        """Заголовок и журнал делят время на представление, SQL и шаблоны."""
+        with override_settings(SERVER_TIMING={
+            'SAMPLE_RATE': 1.0, 'HEADER': True, 'LOG': True,
+        }), self.assertLogs('core.timing', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        metrics = timings(response['Server-Timing'])
+        self.assertEqual(set(metrics), {'view', 'sql', 'tpl', 'total'})
+        self.assertEqual(metrics['sql'][1], 'desc="1 queries"')
+        self.assertGreater(metrics['tpl'][0], 0)
+        self.assertLessEqual(metrics['tpl'][0], metrics['total'][0])
+        [line] = logs.output
+        record = json.loads(re.sub(r'^INFO:core\.timing:', '', line))
+        self.assertEqual(record['url_name'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['sql_queries'], 1)
+
+    def test_cached_page_has_no_sql(self):
+        """Страница из кеша обходится без SQL, остаётся только подстановка
+        личных фрагментов."""
+        url = reverse('posts:group_posts', args=[self.group.slug])
+        self.client.get(url)
+        metrics = timings(self.client.get(url)['Server-Timing'])
+        self.assertEqual(metrics['sql'], (0.0, 'desc="0 queries"'))
+
+    def test_log_is_opt_in(self):
+        """Без LOG замер попадает только в заголовок."""
+        with override_settings(SERVER_TIMING={'SAMPLE_RATE': 1.0}):
+            with self.assertRaises(AssertionError):
+                with self.assertLogs('core.timing', 'INFO'):
+                    response = self.client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+
+    def test_requests_outside_sample_are_not_measured(self):
+        """Вне выборки нет ни заголовка, ни строки в журнале."""
+        with override_settings(SERVER_TIMING={
+            'SAMPLE_RATE': 0.0, 'LOG': True,
+        }):
+            with self.assertRaises(AssertionError):
+                with self.assertLogs('core.timing', 'INFO'):
+                    response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,194 @@
+"""Двухуровневый кеш с защитой от одновременного пересчёта.
+
+Первый уровень — небольшой LRU в памяти процесса, второй — общий кеш
+Django. Значение пересчитывает только один поток во всём кластере: внутри
+процесса это обеспечивает блокировка на ключ, между процессами —
+cache.add() ключа-блокировки. Остальные ждут, пока значение появится в
+общем кеше. Незадолго до истечения срока значение с вероятностью, растущей
+к концу срока, пересчитывается заранее (XFetch), так что популярный ключ
+не истекает у всех одновременно.
+"""
+import math
+import os
+import pickle
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class LocalLRU:
+    """Потокобезопасный LRU; значения хранятся сериализованными."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+        # Копия на каждое чтение: вызывающий код может менять значение.
+        return pickle.loads(data)
+
+    def set(self, key, entry):
+        data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    poll_interval = 0.02
+
+    def __init__(self, shared=cache, local_max_entries=None, beta=None,
+                 lock_timeout=None):
+        options = getattr(settings, 'TIERED_CACHE', {})
+        self.shared = shared
+        self.local = LocalLRU(
+            local_max_entries or options.get('LOCAL_MAX_ENTRIES', 1000)
+        )
+        self.beta = options.get('EARLY_REFRESH_BETA', 1.0) \
+            if beta is None else beta
+        self.lock_timeout = lock_timeout or options.get('LOCK_TIMEOUT', 10)
+        # Блокировка на ключ живёт, пока её кто-то ждёт: общие блокировки
+        # для разных ключей могли бы взаимно заблокировать вложенные вызовы
+        # (запрос из кеша внутри рендера страницы из кеша).
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """Попадания по уровням, промахи, ожидания и ранние пересчёты."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._key_locks_guard:
+            lock, waiting = self._key_locks.get(key, (threading.Lock(), 0))
+            self._key_locks[key] = lock, waiting + 1
+        try:
+            with lock:
+                yield
+        finally:
+            with self._key_locks_guard:
+                lock, waiting = self._key_locks[key]
+                if waiting == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = lock, waiting - 1
+
+    def _lookup(self, key):
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry, 'local'
+        entry = self.shared.get(key)
+        if entry is not None:
+            self.local.set(key, entry)
+        return entry, 'shared'
+
+    def _usable(self, entry, is_fresh, now):
+        value, expires, _ = entry
+        return expires > now and is_fresh(value)
+
+    def _refresh_early(self, entry, now):
+        _, expires, delta = entry
+        return now - delta * self.beta * math.log(random.random()) >= expires
+
+    def fetch(self, key, compute, timeout, is_fresh=lambda value: True,
+              cacheable=lambda value: True):
+        """Значение key из кеша или результат compute().
+
+        is_fresh(value) проверяет значение из кеша, cacheable(value)
+        решает, можно ли сохранить только что вычисленное значение.
+        """
+        now = time.time()
+        entry, tier = self._lookup(key)
+        usable = entry is not None and self._usable(entry, is_fresh, now)
+        if usable and not self._refresh_early(entry, now):
+            self._count(f'{tier}_hits')
+            return entry[0]
+        if usable:
+            self._count('early_refreshes')
+        with self._key_lock(key):
+            if not usable:
+                # Пока ждали блокировку, значение мог посчитать другой поток.
+                entry, tier = self._lookup(key)
+                if entry is not None and self._usable(
+                        entry, is_fresh, time.time()):
+                    self._count('coalesced_waits')
+                    return entry[0]
+            lock_key = f'lock:{key}'
+            if self.shared.add(lock_key, os.getpid(), self.lock_timeout):
+                try:
+                    return self._compute(key, compute, timeout, cacheable)
+                finally:
+                    self.shared.delete(lock_key)
+            if usable:
+                # Заранее пересчитывает другой процесс, старое ещё годно.
+                return entry[0]
+            waited = self._wait(key, lock_key, is_fresh)
+            if waited is not None:
+                self._count('coalesced_waits')
+                return waited[0]
+            return self._compute(key, compute, timeout, cacheable)
+
+    def _wait(self, key, lock_key, is_fresh):
+        """Ждёт значение от процесса, держащего lock_key.
+
+        None — пора считать самому: вышел срок или блокировку сняли без
+        значения (ответ не кешируется или вычисление упало).
+        """
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            time.sleep(self.poll_interval)
+            found = self.shared.get_many([key, lock_key])
+            entry = found.get(key)
+            if entry is not None and self._usable(
+                    entry, is_fresh, time.time()):
+                self.local.set(key, entry)
+                return entry
+            if lock_key not in found:
+                return None
+        return None
+
+    def _compute(self, key, compute, timeout, cacheable):
+        self._count('misses')
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        if cacheable(value):
+            entry = (value, time.time() + timeout, delta)
+            self.shared.set(key, entry, timeout)
+            self.local.set(key, entry)
+        return value
+
+
+tiered_cache = TieredCache()
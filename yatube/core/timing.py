@@ -0,0 +1,129 @@
+"""Время обработки запроса по частям: код представлений, SQL и шаблоны.
+
+ServerTimingMiddleware для доли запросов SERVER_TIMING['SAMPLE_RATE']
+отдаёт заголовок Server-Timing, а с SERVER_TIMING['LOG'] ещё и пишет
+строку JSON в журнал core.timing.
+Запросы к базе меряются через connection.execute_wrapper, шаблоны —
+бэкендом core.template_backends.DjangoTemplates. Остальные запросы
+проходят без учёта, поэтому middleware можно держать включённым всегда.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+class Timing:
+    """Счётчики одного запроса; время в секундах."""
+
+    def __init__(self):
+        self.sql = 0.0
+        self.sql_in_templates = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.template_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql += elapsed
+            self.queries += 1
+            if self.template_depth:
+                self.sql_in_templates += elapsed
+
+
+def current():
+    """Счётчики текущего запроса или None, если он не попал в выборку."""
+    return getattr(_state, 'timing', None)
+
+
+@contextmanager
+def measure_template():
+    """Учитывает время шаблона; вложенные шаблоны не считаются дважды."""
+    timing = current()
+    if timing is None:
+        yield
+        return
+    timing.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.template_depth -= 1
+        if not timing.template_depth:
+            timing.template += time.perf_counter() - started
+
+
+def _config():
+    return {'SAMPLE_RATE': 0.0, 'HEADER': True, 'LOG': False, **getattr(
+        settings, 'SERVER_TIMING', {}
+    )}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = _config()
+        if random.random() >= config['SAMPLE_RATE']:
+            return self.get_response(request)
+        timing = Timing()
+        _state.timing = timing
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            _state.timing = None
+        total = time.perf_counter() - started
+        # SQL из ленивых запросов в шаблоне уже вошёл во время шаблона.
+        sql_in_view = timing.sql - timing.sql_in_templates
+        view = total - timing.template - sql_in_view
+        if config['HEADER']:
+            response['Server-Timing'] = ', '.join((
+                f'view;dur={_ms(view)}',
+                f'sql;dur={_ms(timing.sql)};desc="{timing.queries} queries"',
+                f'tpl;dur={_ms(timing.template)}',
+                f'total;dur={_ms(total)}',
+            ))
+        if config['LOG']:
+            self.log(request, response, total, view, timing)
+        return response
+
+    def log(self, request, response, total, view, timing):
+        match = request.resolver_match
+        record = {
+            'url_name': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'view_ms': _ms(view),
+            'sql_ms': _ms(timing.sql),
+            'sql_queries': timing.queries,
+            'template_ms': _ms(timing.template),
+        }
+        logger.info(
+            json.dumps(record, ensure_ascii=False), extra={'timing': record}
+        )
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('memory/', views.memory_page, name='memory'),
+    path('profiler/', views.profiler_page, name='profiler'),
+    path('profiler/<str:name>/', views.profile_download,
+         name='profile_download'),
+]
@@ -0,0 +1,59 @@
+import os
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect, render
+
+from . import memory, profiler
+
+
+def _number(value, default, low, high):
+    try:
+        return min(max(int(value), low), high)
+    except (TypeError, ValueError):
+        return default
+
+
+@staff_member_required
+def profiler_page(request):
+    """Запуск профайлера в этом процессе и список сохранённых профилей."""
+    config = profiler.config()
+    if request.method == 'POST':
+        profiler.start(
+            _number(request.POST.get('seconds'), config['DURATION'],
+                    1, config['MAX_DURATION']),
+            _number(request.POST.get('interval'),
+                    config['INTERVAL'] * 1000, 1, 1000) / 1000,
+        )
+        return redirect('core:profiler')
+    context = {
+        'pid': os.getpid(),
+        'running': profiler.profiler.running,
+        'duration': config['DURATION'],
+        'max_duration': config['MAX_DURATION'],
+        'interval': round(config['INTERVAL'] * 1000),
+        'signal': (config['SIGNAL'] or '').replace('SIG', ''),
+        'profiles': profiler.saved_profiles(),
+    }
+    return render(request, 'core/profiler.html', context)
+
+
+@staff_member_required
+def profile_download(request, name):
+    if name not in profiler.saved_profiles():
+        raise Http404('Профиль не найден.')
+    path = os.path.join(profiler.config()['OUTPUT_DIR'], name)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
+
+
+@staff_member_required
+def memory_page(request):
+    """Сводки замеров памяти всех процессов из кеша."""
+    config = memory.config()
+    context = {
+        'sample_rate': config['SAMPLE_RATE'],
+        'window': config['WINDOW'],
+        'growth_bytes': config['GROWTH_BYTES'],
+        'summaries': memory.summaries(),
+    }
+    return render(request, 'core/memory.html', context)
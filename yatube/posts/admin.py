@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Group, Post
+from .models import Group, Post, Tag
+from .search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,11 +11,24 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тому же полнотекстовому индексу, что и на сайте,
+        # вместо LIKE '%...%' по всей таблице.
+        if not search_term.strip():
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('title', 'slug', 'description',)
+    list_display = ('title', 'slug', 'description', 'posts_count',)
     prepopulated_fields = {'slug': ('title',)}
 
 
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
+
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Post, PostAdmin)
+admin.site.register(Tag, TagAdmin)
@@ -0,0 +1,184 @@
+"""JSON API только для чтения: ленты, пост и потоковая выгрузка.
+
+Ленты отдаются страницами по курсору, как и HTML-версии. Параметр
+?fields=id,text,author оставляет в ответе только перечисленные поля.
+Авторы и группы выбираются тем же запросом, что и посты.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from core import querycache
+from core.cache import add_dependencies, cache_shared_page
+
+from . import dependencies
+from .models import Group, Post, User
+from .paginators import FEED_ORDERING, KeysetPaginator
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 2000
+
+# Поле ответа -> путь для values() в выгрузке.
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error(message, status):
+    return JsonResponse(
+        {'detail': message}, status=status, json_dumps_params=JSON_PARAMS
+    )
+
+
+def _not_found():
+    return _error('Не найдено.', 404)
+
+
+def _fields(request):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(FIELDS)
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit должен быть целым числом.')
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def serialize(post, fields):
+    """Поля поста из объекта, загруженного через Post.objects.for_feed()."""
+    group = post.group
+    values = {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'updated': post.updated,
+        'author': post.author.username,
+        'author_first_name': post.author.first_name,
+        'author_last_name': post.author.last_name,
+        'group': group.slug if group else None,
+        'group_title': group.title if group else None,
+    }
+    return {name: values[name] for name in fields}
+
+
+def _link(request, **params):
+    query = request.GET.copy()
+    for name in ('after', 'before'):
+        query.pop(name, None)
+    query.update(params)
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def _feed(request, posts):
+    try:
+        fields = _fields(request)
+        paginator = KeysetPaginator(posts, _page_size(request))
+    except BadRequest as error:
+        return _error(str(error), 400)
+    page = paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    response = JsonResponse({
+        'results': [serialize(post, fields) for post in page],
+        'next': _link(request, after=page.next_cursor)
+        if page.has_next() else None,
+        'previous': _link(request, before=page.previous_cursor)
+        if page.has_previous() else None,
+    }, json_dumps_params=JSON_PARAMS)
+    return add_dependencies(response, *dependencies.for_posts(page))
+
+
+@cache_shared_page(lambda request: [dependencies.FEED], per_host=True)
+def index(request):
+    return _feed(request, Post.objects.for_feed())
+
+
+@cache_shared_page(
+    lambda request, slug: [dependencies.group(slug)], per_host=True
+)
+def group_posts(request, slug):
+    try:
+        group = Group.objects.cached().get(slug=slug)
+    except Group.DoesNotExist:
+        return _not_found()
+    return _feed(request, group.posts.for_feed())
+
+
+@cache_shared_page(
+    lambda request, username: [dependencies.author(username)], per_host=True
+)
+def profile(request, username):
+    try:
+        author = querycache.cached(User).get(username=username)
+    except User.DoesNotExist:
+        return _not_found()
+    return _feed(request, author.posts.for_feed())
+
+
+@cache_shared_page(lambda request, post_id: [dependencies.post(post_id)])
+def post_detail(request, post_id):
+    try:
+        fields = _fields(request)
+    except BadRequest as error:
+        return _error(str(error), 400)
+    try:
+        post = Post.objects.for_feed().cached().get(id=post_id)
+    except Post.DoesNotExist:
+        return _not_found()
+    response = JsonResponse(
+        serialize(post, fields), json_dumps_params=JSON_PARAMS
+    )
+    return add_dependencies(response, *dependencies.for_posts([post]))
+
+
+def export(request):
+    """Все посты построчно в JSON Lines, память не растёт с их числом.
+
+    Фильтры ?group=<slug> и ?author=<username>, поля — как в лентах.
+    """
+    try:
+        fields = _fields(request)
+    except BadRequest as error:
+        return _error(str(error), 400)
+    posts = Post.objects.order_by(*FEED_ORDERING)
+    if request.GET.get('group'):
+        posts = posts.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        posts = posts.filter(author__username=request.GET['author'])
+    rows = posts.values_list(*(FIELDS[name] for name in fields)).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    encoder = DjangoJSONEncoder(**JSON_PARAMS)
+
+    def lines():
+        for row in rows:
+            yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+    response = StreamingHttpResponse(
+        lines(), content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'attachment; filename="posts.jsonl"'
+    return response
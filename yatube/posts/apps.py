@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core import querycache
+        from . import search, signals  # noqa: F401
+        from .models import AuthorStats, Group, Post, Tag, User
+
+        querycache.register(Group, Post, AuthorStats, Tag, User)
+        post_migrate.connect(search.reinstall_missing, sender=self)
@@ -0,0 +1,128 @@
+"""Замеры страниц из posts.urls: время ответа, запросы к базе и память.
+
+Каждая страница открывается с пустым кешем и повторно, из кеша. Время
+меряется отдельно от числа запросов и памяти: учёт запросов и
+tracemalloc сами замедляют ответ.
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tiered import tiered_cache
+
+from . import urls
+from .models import AuthorStats, Group, Post, PostTag
+
+# Страницы, которые открываются только автору поста.
+LOGIN_REQUIRED = frozenset(('post_create', 'post_edit'))
+
+
+def sample():
+    """Значения параметров адресов: самые нагруженные группа и автор,
+    свежий пост и хештег, частое слово для поиска."""
+    post = Post.objects.select_related('author').first()
+    if post is None:
+        raise ValueError('Нет постов для замера.')
+    group = Group.objects.order_by('-posts_count').first()
+    author = AuthorStats.objects.select_related('author').order_by(
+        '-posts_count').first()
+    tag = PostTag.objects.select_related('tag').order_by('-pub_date').first()
+    return {
+        'post': post,
+        'kwargs': {
+            'slug': group.slug if group else 'missing',
+            'username': (author.author if author else post.author).username,
+            'post_id': post.pk,
+            'name': tag.tag.name if tag else 'missing',
+        },
+        'query': {'search': {'q': post.text.split()[0]}},
+    }
+
+
+def targets(values):
+    """Тройки (имя URL, адрес, параметры GET) для всех страниц posts."""
+    for pattern in urls.urlpatterns:
+        kwargs = {
+            name: values['kwargs'][name]
+            for name in pattern.pattern.converters
+        }
+        yield (
+            pattern.name,
+            reverse(f'{urls.app_name}:{pattern.name}', kwargs=kwargs),
+            values['query'].get(pattern.name, {}),
+        )
+
+
+def clear_caches():
+    cache.clear()
+    tiered_cache.local.clear()
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def _summary(timings):
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 0.95) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+    }
+
+
+def _profile(client, url, data):
+    """Запросы к базе и пик памяти Python за один ответ."""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return response.status_code, len(queries), peak
+
+
+def measure(client, url, data, repeats):
+    cold, warm = [], []
+    for _ in range(repeats):
+        clear_caches()
+        started = time.perf_counter()
+        client.get(url, data)
+        cold.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        client.get(url, data)
+        warm.append(time.perf_counter() - started)
+    clear_caches()
+    status, cold_queries, cold_peak = _profile(client, url, data)
+    _, warm_queries, warm_peak = _profile(client, url, data)
+    return {
+        'url': url,
+        'status': status,
+        'cold': dict(
+            _summary(cold), queries=cold_queries,
+            peak_memory_kib=round(cold_peak / 1024, 1),
+        ),
+        'warm': dict(
+            _summary(warm), queries=warm_queries,
+            peak_memory_kib=round(warm_peak / 1024, 1),
+        ),
+    }
+
+
+def run(repeats=5):
+    """Результаты замеров по имени URL на текущих данных."""
+    values = sample()
+    guest, author = Client(), Client()
+    author.force_login(values['post'].author)
+    results = {}
+    for name, url, data in targets(values):
+        client = author if name in LOGIN_REQUIRED else guest
+        results[name] = measure(client, url, data, repeats)
+    return results
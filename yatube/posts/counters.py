@@ -0,0 +1,147 @@
+"""Денормализованные счётчики постов у авторов и групп.
+
+Счётчики меняются сигналами при сохранении и удалении поста и массовыми
+методами PostQuerySet; команда rebuild_counters пересчитывает их заново.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.expressions import BaseExpression
+from django.db.models.functions import Coalesce
+
+from core import querycache
+
+from .models import AuthorStats, Group, Post, User
+
+COUNTED_FIELDS = frozenset(('author', 'author_id', 'group', 'group_id'))
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """Отключает сигналы постов, пока массовая операция обновляет сама
+    счётчики и кеш страниц."""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def distribution(relations):
+    """Число постов на каждую пару (author_id, group_id)."""
+    return Counter(relations)
+
+
+def queryset_distribution(queryset):
+    rows = (
+        queryset.order_by()
+        .values_list('author_id', 'group_id')
+        .annotate(total=Count('pk'))
+    )
+    return Counter({(author, group): total for author, group, total in rows})
+
+
+def apply(relations, sign=1):
+    """Прибавляет к счётчикам распределение relations со знаком sign."""
+    authors, groups = Counter(), Counter()
+    for (author_id, group_id), total in relations.items():
+        authors[author_id] += sign * total
+        if group_id is not None:
+            groups[group_id] += sign * total
+    for group_id, delta in groups.items():
+        if delta:
+            Group.objects.filter(pk=group_id).update(
+                posts_count=F('posts_count') + delta
+            )
+    for author_id, delta in authors.items():
+        if delta > 0:
+            add_author_posts(author_id, delta)
+        elif delta:
+            AuthorStats.objects.filter(author_id=author_id).update(
+                posts_count=F('posts_count') + delta
+            )
+
+
+def add_author_posts(author_id, delta):
+    """Прибавляет delta к счётчику автора одним INSERT ... ON CONFLICT.
+
+    Строки ещё нет — счётчик считается по таблице постов. Одновременные
+    первые посты автора не спорят за создание строки, как при чтении и
+    последующей записи.
+    """
+    quote = connection.ops.quote_name
+    stats = quote(AuthorStats._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {stats} ("author_id", "posts_count") '
+            f'SELECT %s, COUNT(*) FROM {quote(Post._meta.db_table)} '
+            f'WHERE "author_id" = %s '
+            f'ON CONFLICT ("author_id") DO UPDATE '
+            f'SET "posts_count" = {stats}."posts_count" + %s',
+            [author_id, author_id, delta],
+        )
+    querycache.invalidate_row(AuthorStats, author_id)
+
+
+def _related_id(value):
+    return getattr(value, 'pk', value)
+
+
+def apply_update(before, changes):
+    """Переносит посты между счётчиками после QuerySet.update().
+
+    Возвращает распределение постов после обновления.
+    """
+    values = {
+        name.replace('_id', ''): value for name, value in changes.items()
+        if name in COUNTED_FIELDS
+    }
+    if not values:
+        return before
+    if any(isinstance(value, BaseExpression) for value in values.values()):
+        rebuild()
+        return Counter()
+    after = Counter()
+    for (author_id, group_id), total in before.items():
+        author_id = _related_id(values.get('author', author_id))
+        group_id = _related_id(values.get('group', group_id))
+        after[author_id, group_id] += total
+    delta = Counter(after)
+    delta.subtract(before)
+    apply(delta)
+    return after
+
+
+def posts_count(user):
+    """Число постов пользователя по счётчику (0, если постов не было)."""
+    stats = getattr(user, 'post_stats', None)
+    return stats.posts_count if stats is not None else 0
+
+
+def _posts_per(field, outer):
+    return Coalesce(Subquery(
+        Post.objects.filter(**{field: OuterRef(outer)})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), Value(0))
+
+
+def rebuild():
+    """Пересчитывает все счётчики по таблице постов."""
+    Group.objects.update(posts_count=_posts_per('group', 'pk'))
+    missing = User.objects.filter(post_stats__isnull=True, posts__isnull=False)
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=pk)
+        for pk in missing.values_list('pk', flat=True).distinct()
+    )
+    AuthorStats.objects.update(posts_count=_posts_per('author', 'author'))
@@ -0,0 +1,125 @@
+"""Массовая загрузка постов: синтетические наборы данных для замеров.
+
+Посты создаются пачками через PostQuerySet.bulk_create, поэтому счётчики,
+хештеги и сброс кеша обновляются один раз на пачку, а не на каждый пост.
+"""
+import datetime as dt
+import random
+from contextlib import contextmanager
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from core import querycache
+
+from .models import Group, Post
+
+User = get_user_model()
+
+SYLLABLES = (
+    'ка ло ми ре то са ну во ги ба де ро пу лы же ти ко на сё ма'
+).split()
+
+
+def vocabulary(generator, size):
+    """size несуществующих слов из двух–четырёх слогов."""
+    words = set()
+    while len(words) < size:
+        length = generator.randint(2, 4)
+        words.add(''.join(generator.choices(SYLLABLES, k=length)))
+    return sorted(words)
+
+
+def zipf_weights(size, exponent=1.0):
+    """Накопленные веса закона Ципфа для random.choices(cum_weights=...)."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+@contextmanager
+def keep_dates():
+    """Даёт bulk_create сохранить заданные даты вместо текущего времени."""
+    fields = [Post._meta.get_field(name) for name in ('pub_date', 'updated')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _ids(model, field, objs):
+    """id объектов objs: недостающие создаются, имеющиеся находятся."""
+    model.objects.bulk_create(objs, ignore_conflicts=True)
+    names = [getattr(obj, field) for obj in objs]
+    ids = {}
+    # Число параметров запроса в SQLite ограничено, ищем частями.
+    for offset in range(0, len(names), 500):
+        ids.update(model.objects.filter(
+            **{f'{field}__in': names[offset:offset + 500]}
+        ).values_list(field, 'id'))
+    return [ids[name] for name in names]
+
+
+def generate(posts, authors=None, groups=None, skew=1.1, seed=0,
+             batch_size=5000, days=365, prefix='dataset'):
+    """Создаёт posts постов и по пачке отдаёт число уже созданных.
+
+    Авторы и группы выбираются по закону Ципфа с показателем skew: у
+    немногих авторов и групп большая часть постов, как на живом сайте.
+    Пятая часть постов без группы, каждый десятый — с хештегом. Даты
+    равномерно растут за последние days дней. Повторный запуск с тем же
+    prefix дописывает посты тем же авторам и группам.
+    """
+    generator = random.Random(seed)
+    authors = authors or max(10, posts // 100)
+    groups = groups or max(5, posts // 1000)
+    author_ids = _ids(User, 'username', [
+        User(username=f'{prefix}-{number}', password='!')
+        for number in range(authors)
+    ])
+    # bulk_create не отправляет сигналы, кеш запросов сбрасываем сами.
+    querycache.invalidate_table(User)
+    group_ids = _ids(Group, 'slug', [
+        Group(
+            slug=f'{prefix}-{number}', title=f'Группа {number}',
+            description=''
+        )
+        for number in range(groups)
+    ])
+    words = vocabulary(generator, 5000)
+    word_weights = zipf_weights(len(words))
+    author_weights = zipf_weights(authors, skew)
+    group_weights = zipf_weights(groups, skew)
+    start = timezone.now() - dt.timedelta(days=days)
+    step = dt.timedelta(days=days) / max(posts, 1)
+
+    def post(number):
+        text = ' '.join(generator.choices(
+            words, cum_weights=word_weights, k=generator.randint(10, 40)
+        ))
+        if generator.random() < 0.1:
+            text += f' #{generator.choice(words[:100])}'
+        pub_date = start + step * number
+        return Post(
+            text=text,
+            author_id=generator.choices(
+                author_ids, cum_weights=author_weights)[0],
+            group_id=generator.choices(
+                group_ids, cum_weights=group_weights)[0]
+            if generator.random() < 0.8 else None,
+            pub_date=pub_date,
+            updated=pub_date,
+        )
+
+    with keep_dates():
+        for offset in range(0, posts, batch_size):
+            batch = range(offset, min(offset + batch_size, posts))
+            with transaction.atomic():
+                Post.objects.bulk_create([post(number) for number in batch])
+            yield batch.stop
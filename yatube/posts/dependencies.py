@@ -0,0 +1,62 @@
+"""Имена зависимостей кеша страниц постов и их инвалидация."""
+from core import cache
+
+from .models import Group, User
+
+FEED = 'feed'
+
+
+def group(slug):
+    return f'group:{slug}'
+
+
+def author(username):
+    return f'author:{username}'
+
+
+def author_info(author_id):
+    """Поля автора, которые показывают карточки постов."""
+    return f'author-info:{author_id}'
+
+
+def group_info(group_id):
+    """Поля группы, которые показывают карточки постов."""
+    return f'group-info:{group_id}'
+
+
+def post(post_id):
+    return f'post:{post_id}'
+
+
+def for_posts(posts):
+    """Авторы и группы, которые показаны вместе с постами."""
+    names = set()
+    for item in posts:
+        names.add(author(item.author.username))
+        if item.group_id is not None:
+            names.add(group(item.group.slug))
+    return names
+
+
+def invalidate(author_ids=(), group_ids=(), post_ids=()):
+    """Сбрасывает главную и страницы затронутых авторов, групп и постов."""
+    author_ids = {pk for pk in author_ids if pk is not None}
+    group_ids = {pk for pk in group_ids if pk is not None}
+    names = [FEED]
+    names.extend(post(pk) for pk in post_ids)
+    if author_ids:
+        names.extend(author(username) for username in User.objects.filter(
+            pk__in=author_ids).values_list('username', flat=True))
+    if group_ids:
+        names.extend(group(slug) for slug in Group.objects.filter(
+            pk__in=group_ids).values_list('slug', flat=True))
+    cache.bump(*names)
+
+
+def invalidate_relations(relations, post_ids=()):
+    """То же для распределения {(author_id, group_id): ...} из counters."""
+    invalidate(
+        author_ids=[author_id for author_id, _ in relations],
+        group_ids=[group_id for _, group_id in relations],
+        post_ids=post_ids,
+    )
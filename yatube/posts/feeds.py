@@ -0,0 +1,148 @@
+"""RSS и Atom последних постов сайта, группы и автора.
+
+Ленты кешируются как обычные страницы (core.cache.cache_shared_page):
+до нового поста в своей области, с ETag и ответом 304 для читалок,
+которые опрашивают ленту.
+"""
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from core import querycache
+from core.cache import add_dependencies, cache_shared_page
+
+from . import dependencies
+from .models import Group, Post, User
+
+FEED_SIZE = 20
+
+
+class Scope:
+    """Что показывает лента: заголовок, ссылка и посты."""
+
+    def __init__(self, title, link, description, posts):
+        self.title = title
+        self.link = link
+        self.description = description
+        self.posts = posts
+        self.items = ()
+
+
+class PostsFeed(Feed):
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # Имена авторов и названия групп в ленте тоже зависимости кеша.
+        return add_dependencies(
+            response, *dependencies.for_posts(request.feed_scope.items)
+        )
+
+    def get_object(self, request, *args, **kwargs):
+        request.feed_scope = self.get_scope(*args, **kwargs)
+        return request.feed_scope
+
+    def title(self, scope):
+        return scope.title
+
+    def link(self, scope):
+        return scope.link
+
+    def description(self, scope):
+        return scope.description
+
+    def items(self, scope):
+        scope.items = list(scope.posts.for_feed()[:FEED_SIZE])
+        return scope.items
+
+    def item_title(self, post):
+        return Truncator(post.text).words(10)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_author_link(self, post):
+        return reverse('posts:profile', args=[post.author.username])
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group else ()
+
+
+class SitePostsFeed(PostsFeed):
+    def get_scope(self):
+        return Scope(
+            'Yatube', reverse('posts:index'),
+            'Последние записи на сайте Yatube', Post.objects.all()
+        )
+
+
+class GroupPostsFeed(PostsFeed):
+    def get_scope(self, slug):
+        group = get_object_or_404(Group.objects.cached(), slug=slug)
+        return Scope(
+            f'Yatube: {group.title}',
+            reverse('posts:group_posts', args=[group.slug]),
+            group.description, group.posts.all()
+        )
+
+
+class AuthorPostsFeed(PostsFeed):
+    def get_scope(self, username):
+        author = get_object_or_404(
+            querycache.cached(User), username=username
+        )
+        return Scope(
+            f'Yatube: {author.get_full_name() or author.username}',
+            reverse('posts:profile', args=[author.username]),
+            f'Записи пользователя {author.username}', author.posts.all()
+        )
+
+
+class SitePostsAtomFeed(SitePostsFeed):
+    feed_type = Atom1Feed
+    subtitle = SitePostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupPostsFeed.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorPostsFeed.description
+
+
+def _site(request):
+    return [dependencies.FEED]
+
+
+def _group(request, slug):
+    return [dependencies.group(slug)]
+
+
+def _author(request, username):
+    return [dependencies.author(username)]
+
+
+# Ссылки в лентах абсолютные, поэтому кеш у каждой схемы и хоста свой.
+site_rss = cache_shared_page(_site, per_host=True)(SitePostsFeed())
+site_atom = cache_shared_page(_site, per_host=True)(SitePostsAtomFeed())
+group_rss = cache_shared_page(_group, per_host=True)(GroupPostsFeed())
+group_atom = cache_shared_page(_group, per_host=True)(GroupPostsAtomFeed())
+author_rss = cache_shared_page(_author, per_host=True)(AuthorPostsFeed())
+author_atom = cache_shared_page(_author, per_host=True)(
+    AuthorPostsAtomFeed()
+)
@@ -0,0 +1,306 @@
+"""Нагрузочный прогон WSGI-приложения в одном процессе, без сети.
+
+Виртуальные пользователи вызывают yatube.wsgi.application напрямую,
+со своими cookies, и выполняют сценарии: чтение лент гостем, просмотр
+сайта после входа и публикацию с правкой постов через формы с CSRF.
+Сценарии выбираются случайно по весам смеси. Потоки делят одно
+соединение с базой на поток, процессы — по соединению на процесс.
+"""
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from io import BytesIO
+from multiprocessing import get_context
+from urllib.parse import unquote_to_bytes, urlencode, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.signals import got_request_exception
+from django.db import OperationalError, connection, connections
+from django.dispatch import receiver
+from django.urls import reverse
+
+from .models import Group, Post, Tag
+
+User = get_user_model()
+
+USER_PREFIX = 'loadtest-'
+PASSWORD = 'loadtest-password'
+
+# Веса сценариев в смеси по умолчанию.
+DEFAULT_MIX = {'feed': 80, 'browse': 15, 'write': 5}
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+_state = threading.local()
+
+
+@receiver(got_request_exception)
+def _remember_exception(sender, request=None, **kwargs):
+    _state.exception = sys.exc_info()[1]
+
+
+def is_lock_error(error):
+    return isinstance(error, OperationalError) and 'locked' in str(error)
+
+
+class WSGIClient:
+    """Браузер без сети: хранит cookies и вызывает WSGI-приложение."""
+
+    def __init__(self, application):
+        self.application = application
+        self.cookies = SimpleCookie()
+
+    def request(self, method, url, data=None):
+        """(статус, заголовки, тело, исключение из представления)."""
+        parts = urlsplit(url)
+        body = urlencode(data or {}).encode() if method == 'POST' else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            # WSGI передаёт путь байтами UTF-8, прочитанными как latin-1.
+            'PATH_INFO': unquote_to_bytes(parts.path).decode('iso-8859-1'),
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={morsel.value}'
+                for name, morsel in self.cookies.items()
+            ),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': BytesIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if method == 'POST':
+            environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+            environ['CONTENT_LENGTH'] = str(len(body))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split()[0])
+            started['headers'] = headers
+
+        _state.exception = None
+        result = self.application(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        for name, value in started['headers']:
+            if name.lower() == 'set-cookie':
+                self.cookies.load(value)
+        return (
+            started['status'], dict(started['headers']), content,
+            _state.exception,
+        )
+
+
+class VirtualUser:
+    """Выполняет сценарии и записывает замер каждого запроса."""
+
+    def __init__(self, application, targets, username, generator):
+        self.client = WSGIClient(application)
+        self.targets = targets
+        self.username = username
+        self.generator = generator
+        self.samples = []
+        self.logged_in = False
+
+    def get(self, name, url):
+        return self.call(name, 'GET', url)
+
+    def call(self, name, method, url, data=None):
+        started = time.perf_counter()
+        status, headers, content, error = self.client.request(
+            method, url, data
+        )
+        self.samples.append((
+            name, time.perf_counter() - started, status,
+            is_lock_error(error),
+        ))
+        return status, headers, content
+
+    def submit(self, name, url, data):
+        """Открывает форму и отправляет её с токеном CSRF."""
+        status, _, content = self.get(name, url)
+        match = CSRF_RE.search(content.decode())
+        if status != 200 or match is None:
+            return None
+        data = dict(data, csrfmiddlewaretoken=match.group(1))
+        return self.call(name, 'POST', url, data)
+
+    def login(self):
+        if not self.logged_in:
+            result = self.submit('login', reverse('users:login'), {
+                'username': self.username, 'password': PASSWORD,
+            })
+            self.logged_in = result is not None and result[0] == 302
+
+    def pick(self, name):
+        return self.generator.choice(self.targets[name])
+
+    def read(self):
+        """Одна страница ленты, группы, автора, поста, хештега или поиска."""
+        page = self.generator.choice((
+            ('index', reverse('posts:index')),
+            ('index', reverse('posts:index') + '?page=2'),
+            ('group_posts', reverse(
+                'posts:group_posts', args=[self.pick('groups')])),
+            ('profile', reverse(
+                'posts:profile', args=[self.pick('authors')])),
+            ('post_detail', reverse(
+                'posts:post_detail', args=[self.pick('posts')])),
+            ('tag_posts', reverse(
+                'posts:tag_posts', args=[self.pick('tags')])),
+            ('search', reverse('posts:search') + '?' + urlencode(
+                {'q': self.pick('words')})),
+            ('index_rss', reverse('posts:index_rss')),
+        ))
+        self.get(*page)
+
+    def feed(self):
+        for _ in range(3):
+            self.read()
+
+    def browse(self):
+        self.login()
+        for _ in range(3):
+            self.read()
+        self.get('profile', reverse('posts:profile', args=[self.username]))
+
+    def write(self):
+        self.login()
+        result = self.submit('post_create', reverse('posts:post_create'), {
+            'text': f'Нагрузочный пост {self.generator.random()}',
+        })
+        if result is None or result[0] != 302:
+            return
+        post = Post.objects.filter(
+            author__username=self.username).values_list('pk', flat=True)
+        post_id = post.first()
+        if post_id is not None:
+            self.submit('post_edit', reverse(
+                'posts:post_edit', args=[post_id]
+            ), {'text': f'Исправленный пост {self.generator.random()}'})
+
+
+def prepare(users):
+    """Учётные записи виртуальных пользователей и адреса для чтения."""
+    usernames = [f'{USER_PREFIX}{number}' for number in range(users)]
+    existing = set(User.objects.filter(
+        username__in=usernames).values_list('username', flat=True))
+    for username in usernames:
+        if username not in existing:
+            User.objects.create_user(username=username, password=PASSWORD)
+    posts = list(Post.objects.values_list('pk', 'text')[:100])
+    if not posts:
+        raise ValueError('Нет постов для нагрузки.')
+    return usernames, {
+        'groups': list(Group.objects.order_by(
+            '-posts_count').values_list('slug', flat=True)[:50])
+        or ['missing'],
+        'authors': list(Post.objects.values_list(
+            'author__username', flat=True).distinct()[:50]),
+        'posts': [pk for pk, _ in posts],
+        'tags': list(Tag.objects.values_list('name', flat=True)[:50])
+        or ['missing'],
+        'words': [text.split()[0] for _, text in posts if text.split()],
+    }
+
+
+def worker(usernames, targets, mix, duration, iterations, seed):
+    """Гоняет сценарии по очереди для своих пользователей, отдаёт замеры."""
+    from yatube.wsgi import application
+
+    generator = random.Random(seed)
+    users = [
+        VirtualUser(application, targets, username, generator)
+        for username in usernames
+    ]
+    names, weights = zip(*mix.items())
+    deadline = time.perf_counter() + duration
+    done = 0
+    try:
+        while (
+            done < iterations if iterations
+            else time.perf_counter() < deadline
+        ):
+            user = users[done % len(users)]
+            scenario = generator.choices(names, weights)[0]
+            getattr(user, scenario)()
+            done += 1
+    finally:
+        connection.close()
+    return [sample for user in users for sample in user.samples]
+
+
+def _percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def summarize(samples, elapsed):
+    """Пропускная способность, перцентили, ошибки и блокировки SQLite."""
+    by_name = defaultdict(list)
+    for sample in samples:
+        by_name[sample[0]].append(sample)
+
+    def stats(rows):
+        timings = sorted(row[1] for row in rows)
+        errors = sum(1 for row in rows if row[2] >= 400)
+        locks = sum(1 for row in rows if row[3])
+        return {
+            'requests': len(rows),
+            'throughput_rps': round(len(rows) / elapsed, 2),
+            'p50_ms': round(_percentile(timings, 0.5) * 1000, 2),
+            'p95_ms': round(_percentile(timings, 0.95) * 1000, 2),
+            'p99_ms': round(_percentile(timings, 0.99) * 1000, 2),
+            'error_rate': round(errors / len(rows), 4),
+            'lock_error_rate': round(locks / len(rows), 4),
+        }
+
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'total': stats(samples) if samples else None,
+        'urls': {name: stats(rows) for name, rows in sorted(by_name.items())},
+    }
+
+
+def run(concurrency=8, mode='thread', mix=None, duration=10,
+        iterations=None, users=None, seed=0):
+    """Запускает concurrency потоков или процессов и сводит замеры."""
+    usernames, targets = prepare(users or concurrency)
+    mix = mix or DEFAULT_MIX
+    jobs = [
+        (usernames[number::concurrency] or usernames[:1], targets, mix,
+         duration, iterations, seed + number)
+        for number in range(concurrency)
+    ]
+    if mode == 'process':
+        # Дочерние процессы не должны делить соединение с родителем.
+        connections.close_all()
+        pool = ProcessPoolExecutor(concurrency, mp_context=get_context('fork'))
+    else:
+        pool = ThreadPoolExecutor(concurrency)
+    started = time.perf_counter()
+    with pool:
+        results = [pool.submit(worker, *job) for job in jobs]
+        samples = [sample for result in results for sample in result.result()]
+    return summarize(samples, time.perf_counter() - started)
+
+
+def cleanup():
+    """Удаляет посты, созданные виртуальными пользователями."""
+    return Post.objects.filter(
+        author__username__startswith=USER_PREFIX
+    ).delete()[0]
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import tags
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет индекс хештегов по текстам существующих постов. Посты '
+        'читаются пачками по возрастанию id, каждая пачка — в своей '
+        'транзакции, поэтому команду можно прервать и запустить снова.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--start', type=int, default=0,
+            help='Начать с постов, чей id больше этого.'
+        )
+
+    def handle(self, *args, **options):
+        last_pk = options['start']
+        seen = changed = 0
+        started = time.perf_counter()
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('text', 'pub_date')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                changed += tags.sync_posts(batch)
+            seen += len(batch)
+            last_pk = batch[-1].pk
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Обработано постов: {seen} (до id {last_pk}), '
+                f'{seen / elapsed:.0f} в секунду'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: просмотрено {seen}, обновлено {changed} постов.'
+        ))
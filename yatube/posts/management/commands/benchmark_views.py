@@ -0,0 +1,110 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts import benchmarks, datasets
+from posts.models import Post
+
+
+def commit():
+    """Текущий коммит, чтобы сравнивать результаты между версиями."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет все страницы posts: медиану и 95-й перцентиль времени '
+        'ответа, число запросов и пик памяти, с пустым и с прогретым '
+        'кешем. С --sizes для каждого размера создаётся синтетический '
+        'набор постов во временной транзакции; без него замеряются '
+        'текущие данные. Результаты пишутся в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+',
+            help='Размеры наборов, например --sizes 10000 100000.'
+        )
+        parser.add_argument('--repeats', type=int, default=5)
+        parser.add_argument('--skew', type=float, default=1.1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для результатов в JSON или «-» для stdout.'
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            'created': timezone.now().isoformat(),
+            'commit': commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeats': options['repeats'],
+            'datasets': [
+                self.benchmark(size, options)
+                for size in options['sizes'] or [None]
+            ],
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(text)
+            return
+        try:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+        except OSError as error:
+            raise CommandError(f'Не удалось записать результаты: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}.'
+        ))
+
+    def benchmark(self, size, options):
+        if size is None:
+            return self.run(Post.objects.count(), False, options)
+        with transaction.atomic():
+            started = time.perf_counter()
+            for _ in datasets.generate(
+                size, skew=options['skew'], seed=options['seed'],
+                prefix='benchmark',
+            ):
+                pass
+            self.stderr.write(
+                f'Набор из {size} постов создан за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+            try:
+                return self.run(size, True, options)
+            finally:
+                transaction.set_rollback(True)
+                # В кеше остались страницы с откаченными постами.
+                benchmarks.clear_caches()
+
+    def run(self, size, generated, options):
+        try:
+            results = benchmarks.run(options['repeats'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        for name, result in results.items():
+            self.stderr.write(
+                f'{size:>9} {name:>14}: {result["status"]}, '
+                f'{result["cold"]["median_ms"]:8.2f} мс / '
+                f'{result["warm"]["median_ms"]:7.2f} мс из кеша, '
+                f'запросов {result["cold"]["queries"]:3} / '
+                f'{result["warm"]["queries"]}'
+            )
+        return {'posts': size, 'generated': generated, 'results': results}
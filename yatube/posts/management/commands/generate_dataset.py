@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import datasets
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетический набор постов для замеров: от десятков тысяч '
+        'до десятков миллионов, с перекосом постов в пользу немногих '
+        'авторов и групп. Посты создаются пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10 ** 4)
+        parser.add_argument(
+            '--authors', type=int,
+            help='Сколько авторов; по умолчанию один на сотню постов.'
+        )
+        parser.add_argument(
+            '--groups', type=int,
+            help='Сколько групп; по умолчанию одна на тысячу постов.'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для авторов и групп; 0 — без '
+                 'перекоса.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='dataset',
+            help='Начало имён созданных авторов и адресов групп.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = 0
+        for created in datasets.generate(
+            options['posts'], authors=options['authors'],
+            groups=options['groups'], skew=options['skew'],
+            seed=options['seed'], batch_size=options['batch_size'],
+            prefix=options['prefix'],
+        ):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Создано постов: {created}, {created / elapsed:.0f} в секунду'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {created} постов за '
+            f'{time.perf_counter() - started:.1f} с.'
+        ))
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core import querycache
+from posts.datasets import keep_dates
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def _validate(model, field, value):
+    """Валидаторы поля модели: ссылки на автора и группу строятся по ним."""
+    try:
+        model._meta.get_field(field).run_validators(value)
+    except ValidationError:
+        raise ValueError(f'неверное поле {field}: {value!r}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSON Lines или CSV (файл или «-» для stdin). '
+        'Поля: text, author, group, pub_date, а для новых авторов и групп '
+        'также author_first_name, author_last_name и group_title. '
+        'Недостающие авторы и группы создаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат данных; по умолчанию по расширению файла.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        data_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl'
+        )
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8') \
+                if hasattr(sys.stdin, 'buffer') else sys.stdin
+            self.run(stream, data_format, options['batch_size'])
+            return
+        try:
+            stream = open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        with stream:
+            self.run(stream, data_format, options['batch_size'])
+
+    def run(self, stream, data_format, batch_size):
+        self.authors = {}
+        self.groups = {}
+        records = self.read(stream, data_format)
+        imported = skipped = 0
+        started = time.perf_counter()
+        with keep_dates():
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                rows = [row for row in batch if row is not None]
+                skipped += len(batch) - len(rows)
+                with transaction.atomic():
+                    self.import_batch(rows)
+                imported += len(rows)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'Импортировано постов: {imported}, '
+                    f'{imported / elapsed:.0f} в секунду'
+                )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {imported} постов за {elapsed:.1f} с '
+            f'({imported / elapsed if elapsed else 0:.0f} в секунду), '
+            f'пропущено строк: {skipped}.'
+        ))
+
+    def read(self, stream, data_format):
+        """Записи по одной; для испорченных строк — None."""
+        if data_format == 'csv':
+            lines = enumerate(csv.DictReader(stream), start=2)
+        else:
+            lines = (
+                (number, line)
+                for number, line in enumerate(stream, start=1)
+                if line.strip()
+            )
+        for number, line in lines:
+            try:
+                record = json.loads(line) if data_format == 'jsonl' else line
+                yield self.clean(record)
+            except (AttributeError, TypeError, ValueError) as error:
+                self.stderr.write(f'Строка {number} пропущена: {error}')
+                yield None
+
+    def clean(self, record):
+        text = (record.get('text') or '').strip()
+        author = (record.get('author') or '').strip()
+        if not text or not author:
+            raise ValueError('нужны поля text и author')
+        _validate(User, User.USERNAME_FIELD, author)
+        group = (record.get('group') or '').strip() or None
+        if group is not None:
+            _validate(Group, 'slug', group)
+        pub_date = record.get('pub_date') or None
+        if pub_date is not None:
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError('неверный формат pub_date')
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return {
+            'text': text,
+            'author': author,
+            'author_first_name': record.get('author_first_name') or '',
+            'author_last_name': record.get('author_last_name') or '',
+            'group': group,
+            'group_title': record.get('group_title') or '',
+            'pub_date': pub_date or timezone.now(),
+        }
+
+    def resolve_authors(self, rows):
+        missing = {row['author'] for row in rows} - self.authors.keys()
+        if not missing:
+            return
+        self.authors.update(User.objects.filter(
+            username__in=missing).values_list('username', 'id'))
+        new = {}
+        for row in rows:
+            if row['author'] not in self.authors:
+                new.setdefault(row['author'], User(
+                    username=row['author'],
+                    first_name=row['author_first_name'],
+                    last_name=row['author_last_name'],
+                    password='!',
+                ))
+        if new:
+            User.objects.bulk_create(new.values())
+            self.authors.update(User.objects.filter(
+                username__in=new).values_list('username', 'id'))
+            # bulk_create не отправляет сигналы, кеш запросов сбрасываем сами.
+            querycache.invalidate_table(User)
+
+    def resolve_groups(self, rows):
+        missing = {
+            row['group'] for row in rows if row['group'] is not None
+        } - self.groups.keys()
+        if not missing:
+            return
+        self.groups.update(Group.objects.filter(
+            slug__in=missing).values_list('slug', 'id'))
+        new = {}
+        for row in rows:
+            slug = row['group']
+            if slug is not None and slug not in self.groups:
+                new.setdefault(slug, Group(
+                    slug=slug, title=row['group_title'] or slug,
+                    description='',
+                ))
+        if new:
+            Group.objects.bulk_create(new.values())
+            self.groups.update(Group.objects.filter(
+                slug__in=new).values_list('slug', 'id'))
+
+    def import_batch(self, rows):
+        self.resolve_authors(rows)
+        self.resolve_groups(rows)
+        # Счётчики, хештеги и сброс кеша PostQuerySet.bulk_create
+        # выполняет один раз на пачку.
+        Post.objects.bulk_create(
+            Post(
+                text=row['text'],
+                author_id=self.authors[row['author']],
+                group_id=self.groups.get(row['group']),
+                pub_date=row['pub_date'],
+                updated=row['pub_date'],
+            )
+            for row in rows
+        )
@@ -0,0 +1,101 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import loadtest
+
+
+def parse_mix(value):
+    """Смесь сценариев вида feed=80,browse=15,write=5."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in loadtest.DEFAULT_MIX:
+            raise CommandError(f'Неизвестный сценарий: {name}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес сценария {name}: {weight}')
+    if not any(mix.values()):
+        raise CommandError('У смеси сценариев нулевые веса.')
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает yatube.wsgi.application в этом процессе, без сети: '
+        'гости читают ленты, вошедшие пользователи смотрят сайт и '
+        'публикуют посты через формы с CSRF. Печатает пропускную '
+        'способность, p50/p95/p99 по именам URL, долю ошибок и '
+        'блокировок SQLite. Посты виртуальных пользователей потом '
+        'удаляются, если не указан --keep-data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--mode', choices=('thread', 'process'), default='thread'
+        )
+        parser.add_argument(
+            '--mix', type=parse_mix,
+            default=dict(loadtest.DEFAULT_MIX),
+            help='Веса сценариев feed, browse и write, например '
+                 'feed=80,browse=15,write=5.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10,
+            help='Сколько секунд длится нагрузка.'
+        )
+        parser.add_argument(
+            '--iterations', type=int,
+            help='Сколько сценариев выполнить в каждом потоке вместо '
+                 '--duration.'
+        )
+        parser.add_argument(
+            '--users', type=int,
+            help='Сколько учётных записей; по умолчанию по одной на поток.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Файл для результатов в JSON.'
+        )
+        parser.add_argument('--keep-data', action='store_true')
+
+    def handle(self, *args, **options):
+        # Ошибки и так попадут в отчёт; трассировки — только с -v 2.
+        request_logger = logging.getLogger('django.request')
+        request_logger.disabled = options['verbosity'] < 2
+        try:
+            report = loadtest.run(
+                concurrency=options['concurrency'], mode=options['mode'],
+                mix=options['mix'], duration=options['duration'],
+                iterations=options['iterations'], users=options['users'],
+                seed=options['seed'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        finally:
+            request_logger.disabled = False
+            if not options['keep_data']:
+                loadtest.cleanup()
+        for name, stats in report['urls'].items():
+            self.stdout.write(self.line(name, stats))
+        if report['total'] is not None:
+            self.stdout.write(self.style.SUCCESS(
+                self.line('всего', report['total'])
+            ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def line(self, name, stats):
+        return (
+            f'{name:>12}: {stats["requests"]:6} запр., '
+            f'{stats["throughput_rps"]:8.1f} в с, '
+            f'p50 {stats["p50_ms"]:7.1f} мс, p95 {stats["p95_ms"]:7.1f} мс, '
+            f'p99 {stats["p99_ms"]:7.1f} мс, '
+            f'ошибок {stats["error_rate"]:.2%}, '
+            f'блокировок {stats["lock_error_rate"]:.2%}'
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересоздаёт полнотекстовый индекс постов и его триггеры. '
+        'После migrate пропавшие триггеры восстанавливаются сами.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.install()
+        self.stdout.write(self.style.SUCCESS('Индекс поиска пересоздан.'))
@@ -0,0 +1,76 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts import search
+from posts.datasets import vocabulary, zipf_weights
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает полнотекстовый поиск с LIKE на синтетических постах. '
+        'Посты создаются во временной транзакции и удаляются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--words', type=int, default=30,
+                            help='Сколько слов в каждом посте.')
+        parser.add_argument('--vocabulary', type=int, default=20000,
+                            help='Сколько разных слов в текстах.')
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not search.is_indexed():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        generator = random.Random(options['seed'])
+        words = vocabulary(generator, options['vocabulary'])
+        # Частоты слов по закону Ципфа: есть и частые, и редкие слова.
+        weights = zipf_weights(len(words))
+        with transaction.atomic():
+            author = User.objects.create(username='search-benchmark')
+            started = time.perf_counter()
+            Post.objects.bulk_create(
+                (
+                    Post(author=author, text=' '.join(generator.choices(
+                        words, cum_weights=weights, k=options['words']
+                    )))
+                    for _ in range(options['posts'])
+                )
+            )
+            self.stdout.write(
+                f'Создано постов: {options["posts"]} за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+            queries = [
+                ' '.join(generator.sample(words, generator.randint(1, 2)))
+                for _ in range(options['queries'])
+            ]
+            posts = Post.objects.for_feed()
+            self.report('LIKE', queries, lambda query: posts.filter(
+                text__icontains=query.split()[0]
+            ).filter(text__icontains=query.split()[-1]))
+            self.report('FTS5', queries, lambda query: search.search_posts(
+                posts, query
+            ).order_by(*search.SEARCH_ORDERING))
+            transaction.set_rollback(True)
+
+    def report(self, name, queries, build):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            list(build(query)[:10])
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'{name:>5}: медиана {statistics.median(timings) * 1000:8.2f} мс, '
+            f'максимум {max(timings) * 1000:8.2f} мс '
+            f'на {len(timings)} запросов'
+        )
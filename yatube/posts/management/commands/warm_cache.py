@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import AuthorStats, Group, Post
+from posts.paginators import KeysetPaginator
+from posts.views import MAX_POSTS
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кеш после деплоя: запрашивает первые страницы ленты, '
+        'популярные группы, профили активных авторов и свежие посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--index-pages', type=int, default=5,
+            help='Сколько первых страниц главной ленты прогреть.'
+        )
+        parser.add_argument(
+            '--groups', type=int, default=10,
+            help='Сколько групп с наибольшим числом постов прогреть.'
+        )
+        parser.add_argument(
+            '--authors', type=int, default=10,
+            help='Сколько профилей самых активных авторов прогреть.'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=50,
+            help='Сколько последних постов прогреть.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Сколько страниц рендерится одновременно.'
+        )
+
+    def handle(self, *args, **options):
+        urls = list(self.urls(options))
+        local = threading.local()
+        timings = defaultdict(list)
+        failures = []
+
+        def warm(url_name, url):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            started = time.perf_counter()
+            try:
+                status = local.client.get(url).status_code
+            finally:
+                # Соединения потоков пула сами не закрываются.
+                connection.close()
+            return url_name, url, status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = pool.map(lambda item: warm(*item), urls)
+            for url_name, url, status, elapsed in results:
+                timings[url_name].append(elapsed)
+                if status != 200:
+                    failures.append(f'{url}: {status}')
+        total = time.perf_counter() - started
+
+        for url_name, elapsed in timings.items():
+            self.stdout.write(
+                f'{url_name:>12}: {len(elapsed):4} стр. за '
+                f'{sum(elapsed):7.2f} с, максимум {max(elapsed):.3f} с'
+            )
+        for failure in failures:
+            self.stderr.write(f'Не удалось прогреть {failure}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрето страниц: {len(urls) - len(failures)} из {len(urls)} '
+            f'за {total:.2f} с.'
+        ))
+
+    def urls(self, options):
+        """Пары (имя URL, адрес) в порядке убывания важности."""
+        index = reverse('posts:index')
+        paginator = KeysetPaginator(Post.objects.for_feed(), MAX_POSTS)
+        after = None
+        for _ in range(options['index_pages']):
+            yield 'index', f'{index}?after={after}' if after else index
+            page = paginator.get_cursor_page(after=after)
+            if not page.has_next():
+                break
+            after = page.next_cursor
+
+        groups = Group.objects.order_by('-posts_count').values_list(
+            'slug', flat=True
+        )[:options['groups']]
+        for slug in groups:
+            yield 'group_posts', reverse('posts:group_posts', args=[slug])
+
+        authors = AuthorStats.objects.order_by('-posts_count').values_list(
+            'author__username', flat=True
+        )[:options['authors']]
+        for username in authors:
+            yield 'profile', reverse('posts:profile', args=[username])
+
+        posts = Post.objects.values_list('pk', flat=True)[:options['posts']]
+        for pk in posts:
+            yield 'post_detail', reverse('posts:post_detail', args=[pk])
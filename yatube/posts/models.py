@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.querycache import CachedQuerySet
 
 User = get_user_model()
 
@@ -8,11 +11,77 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Число постов',
+        default=0,
+        editable=False
+    )
+
+    objects = CachedQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.title
 
 
+class PostQuerySet(CachedQuerySet):
+    """Массовые операции с постами поддерживают счётчики и хештеги."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from . import counters, dependencies, tags
+
+        with transaction.atomic(using=self.db):
+            last_pk = self.model.objects.using(self.db).aggregate(
+                last=models.Max('pk'))['last'] or 0
+            objs = super().bulk_create(objs, *args, **kwargs)
+            # SQLite не возвращает id созданных строк, но внутри транзакции
+            # все посты после last_pk — только что созданные.
+            tags.sync_posts(
+                objs if all(post.pk for post in objs)
+                else self.model.objects.using(self.db).filter(pk__gt=last_pk)
+            )
+        created = counters.distribution(
+            (post.author_id, post.group_id) for post in objs
+        )
+        counters.apply(created)
+        dependencies.invalidate_relations(created)
+        return objs
+
+    def update(self, **kwargs):
+        from . import counters, dependencies, tags
+
+        kwargs.setdefault('updated', timezone.now())
+        with transaction.atomic(using=self.db):
+            before = counters.queryset_distribution(self)
+            retag = {'text', 'pub_date'} & kwargs.keys()
+            pks = list(self.values_list('pk', flat=True)) if retag else ()
+            rows = super().update(**kwargs)
+            after = counters.apply_update(before, kwargs)
+            if pks:
+                tags.sync_posts(self.model.objects.using(self.db).filter(
+                    pk__in=pks).only('text', 'pub_date'))
+        dependencies.invalidate_relations(before + after)
+        return rows
+
+    def delete(self):
+        from . import counters, dependencies
+
+        with transaction.atomic(using=self.db):
+            before = counters.queryset_distribution(self)
+            with counters.suspended():
+                result = super().delete()
+            counters.apply(before, sign=-1)
+        dependencies.invalidate_relations(before)
+        return result
+
+    def for_feed(self):
+        """Посты с автором и группой одним запросом, только нужные поля."""
+        return self.select_related('author', 'group').only(
+            'text', 'pub_date', 'updated', 'author', 'group',
+            'author__username', 'author__first_name', 'author__last_name',
+            'group__slug', 'group__title',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -22,6 +91,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,8 +112,122 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост'
     )
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:15]
 
+    def fragment_dependencies(self):
+        """Версии, от которых зависит карточка поста (cache_fragment):
+        имя автора и название группы меняются без правки поста."""
+        from . import dependencies
+
+        names = [dependencies.author_info(self.author_id)]
+        if self.group_id is not None:
+            names.append(dependencies.group_info(self.group_id))
+        return names
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'author_id' in loaded and 'group_id' in loaded:
+            # Нужны счётчикам, чтобы заметить смену автора или группы.
+            instance._counted_relations = (
+                loaded['author_id'], loaded['group_id']
+            )
+        return instance
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Tag(models.Model):
+    name = models.CharField('Название', max_length=100, unique=True)
+
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Хештег'
+        verbose_name_plural = 'Хештеги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTagQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Связи с постами для ленты тега, посты как в Post.for_feed()."""
+        return self.select_related('post__author', 'post__group').only(
+            'pub_date', 'tag', 'post', 'post__text', 'post__pub_date',
+            'post__updated', 'post__author', 'post__group',
+            'post__author__username', 'post__author__first_name',
+            'post__author__last_name', 'post__group__slug',
+            'post__group__title',
+        )
+
+
+class PostTag(models.Model):
+    """Обратный индекс хештегов: строка на каждый тег в тексте поста.
+
+    Дата публикации скопирована из поста, чтобы лента тега читалась по
+    индексу (tag, pub_date) без сортировки и без чтения текстов постов.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Пост'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Хештег'
+    )
+    pub_date = models.DateTimeField('Дата публикации поста')
+
+    objects = PostTagQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-pub_date']
+        verbose_name = 'Хештег поста'
+        verbose_name_plural = 'Хештеги постов'
+        unique_together = ('post', 'tag')
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date', '-post'],
+                name='post_tag_feed_idx',
+            ),
+        ]
@@ -0,0 +1,256 @@
+import base64
+import datetime as dt
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+FEED_ORDERING = ('-pub_date', '-id')
+
+
+def _json_default(value):
+    # DjangoJSONEncoder обрезает микросекунды, а ключу нужна точность.
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} нельзя положить в курсор')
+
+
+def encode_cursor(values):
+    """Упаковывает значения ключа сортировки в строку для URL."""
+    raw = json.dumps(values, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор; для испорченного курсора возвращает None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def keyset_filter(ordering, values, reverse=False):
+    """Условие «строго после ключа values» в порядке ordering.
+
+    Первое поле дополнительно ограничено нестрогим неравенством, чтобы
+    база могла начать чтение индекса сразу с нужной позиции.
+    """
+    condition = None
+    for name, value in reversed(list(zip(ordering, values))):
+        descending = name.startswith('-') != reverse
+        field = name.lstrip('-')
+        strict = Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+        if condition is None:
+            condition = strict
+        else:
+            condition = strict | (Q(**{field: value}) & condition)
+    first = ordering[0]
+    bound = 'lte' if first.startswith('-') != reverse else 'gte'
+    return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        name[1:] if name.startswith('-') else f'-{name}' for name in ordering
+    )
+
+
+class FeedPage(Page):
+    """Страница с ограниченным окном ссылок на соседние страницы."""
+
+    @property
+    def page_links(self):
+        return self.paginator.page_links(self.number)
+
+
+class FeedPaginator(Paginator):
+    """Паджинатор ленты без COUNT(*) на каждый запрос.
+
+    Общее число записей берётся из подсказки count (например,
+    денормализованного счётчика) или из кеша, где живёт не дольше
+    PAGINATOR_COUNT_TIMEOUT секунд. Если устаревшее число не даёт открыть
+    существующую страницу, оно пересчитывается точно.
+    """
+
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        self._count_hint = count
+        self.count_is_estimate = False
+        super().__init__(object_list, per_page, **kwargs)
+
+    def _count_cache_key(self):
+        sql = str(self.object_list.query).encode()
+        return f'paginator:count:{hashlib.md5(sql).hexdigest()}'
+
+    @cached_property
+    def count(self):
+        if self._count_hint is not None:
+            hint = self._count_hint
+            return hint() if callable(hint) else hint
+        key = self._count_cache_key()
+        count = cache.get(key)
+        if count is not None:
+            self.count_is_estimate = True
+            return count
+        count = Paginator.count.func(self)
+        cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def refresh_count(self):
+        """Отбрасывает приблизительное число и считает записи заново."""
+        self._count_hint = None
+        self.count_is_estimate = False
+        self.__dict__.pop('num_pages', None)
+        self.__dict__['count'] = count = Paginator.count.func(self)
+        cache.set(self._count_cache_key(), count,
+                  settings.PAGINATOR_COUNT_TIMEOUT)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimate:
+                raise
+        self.refresh_count()
+        return super().validate_number(number)
+
+    def page(self, number):
+        page = super().page(number)
+        if self.count_is_estimate and page.number > 1 and not page:
+            self.refresh_count()
+            page = super().page(number)
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def page_links(self, number):
+        """Номера страниц вокруг number; None обозначает пропуск."""
+        num_pages = self.num_pages
+        window = set(range(max(number - self.on_each_side, 1),
+                           min(number + self.on_each_side, num_pages) + 1))
+        window.update(range(1, min(self.on_ends, num_pages) + 1))
+        window.update(range(max(num_pages - self.on_ends + 1, 1),
+                            num_pages + 1))
+        links = []
+        for page in sorted(window):
+            if links and page - links[-1] > 1:
+                links.append(None)
+            links.append(page)
+        return links
+
+
+class KeysetPage(Page):
+    """Страница ленты, адресуемая курсором, а не номером."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        # Курсоры берутся из строк выборки: view может заменить
+        # object_list, например связями тега на сами посты.
+        self._edges = (object_list[0], object_list[-1]) if object_list \
+            else None
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} items>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self._edges:
+            return None
+        return self.paginator.cursor_for(self._edges[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self._edges:
+            return None
+        return self.paginator.cursor_for(self._edges[0])
+
+
+class KeysetPaginator(FeedPaginator):
+    """Паджинатор по ключу сортировки (pub_date, id).
+
+    Страница выбирается условием WHERE по ключу последней показанной
+    записи, поэтому стоимость запроса не зависит от глубины страницы.
+    Номера страниц (?page=N) по-прежнему обслуживаются обычным
+    LIMIT/OFFSET через get_page().
+    """
+
+    def __init__(self, object_list, per_page, ordering=FEED_ORDERING,
+                 **kwargs):
+        self.ordering = tuple(ordering)
+        super().__init__(object_list.order_by(*self.ordering), per_page,
+                         **kwargs)
+
+    def cursor_for(self, obj):
+        return encode_cursor(
+            [getattr(obj, name.lstrip('-')) for name in self.ordering]
+        )
+
+    def _cursor_values(self, cursor):
+        values = decode_cursor(cursor) if cursor else None
+        if values is None or len(values) != len(self.ordering):
+            return None
+        try:
+            return [
+                self._ordering_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValidationError):
+            return None
+
+    def _ordering_field(self, name):
+        # Сортировать можно и по аннотации, например по релевантности.
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def get_cursor_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before.
+
+        Без курсора (или с испорченным курсором) отдаётся первая страница.
+        """
+        if before:
+            values = self._cursor_values(before)
+            if values is not None:
+                return self._page_before(values)
+        values = self._cursor_values(after) if after else None
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, values))
+        items = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            items[:self.per_page], self,
+            has_next=len(items) > self.per_page,
+            has_previous=values is not None,
+        )
+
+    def _page_before(self, values):
+        queryset = self.object_list.filter(
+            keyset_filter(self.ordering, values, reverse=True)
+        ).order_by(*reverse_ordering(self.ordering))
+        items = list(queryset[:self.per_page + 1])
+        if len(items) <= self.per_page:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self.get_cursor_page()
+        return KeysetPage(items[:self.per_page][::-1], self, has_next=True,
+                          has_previous=True)
@@ -0,0 +1,129 @@
+"""Полнотекстовый поиск по постам на индексе SQLite FTS5.
+
+Индекс — внешняя таблица FTS5 поверх posts_post: текст в ней не
+дублируется, а синхронизацию с постами ведут триггеры, поэтому индекс
+видит и массовые операции (bulk_create, update, delete). Django
+пересоздаёт таблицу при некоторых миграциях SQLite и теряет триггеры;
+после каждого migrate обработчик post_migrate (reinstall_missing)
+проверяет их и, если какого-то нет, создаёт заново и перестраивает индекс.
+На других базах поиск работает через LIKE и без ранжирования.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'posts_post_fts'
+POSTS = 'posts_post'
+
+TRIGGERS = ('insert', 'delete', 'update')
+
+# Лучшие совпадения первыми: bm25 в FTS5 тем меньше, чем лучше.
+SEARCH_ORDERING = ('rank', '-id')
+
+SCHEMA = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+        text, content='{POSTS}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_insert AFTER INSERT ON {POSTS}
+    BEGIN
+        INSERT INTO {TABLE} (rowid, text) VALUES (NEW.id, NEW.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_delete AFTER DELETE ON {POSTS}
+    BEGIN
+        INSERT INTO {TABLE} ({TABLE}, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_update
+    AFTER UPDATE OF text ON {POSTS}
+    BEGIN
+        INSERT INTO {TABLE} ({TABLE}, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+        INSERT INTO {TABLE} (rowid, text) VALUES (NEW.id, NEW.text);
+    END""",
+)
+
+
+def is_indexed(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """Создаёт индекс и триггеры, если их нет, и заполняет индекс заново."""
+    if not is_indexed(using):
+        return
+    with using.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('rebuild')")
+
+
+def _schema_objects(using):
+    names = [TABLE] + [f'{TABLE}_{suffix}' for suffix in TRIGGERS]
+    with using.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN ({})'.format(
+                ', '.join(['%s'] * len(names))
+            ),
+            names,
+        )
+        return {row[0] for row in cursor.fetchall()}, set(names)
+
+
+def is_installed(using=connection):
+    """Есть ли индекс и все его триггеры."""
+    found, expected = _schema_objects(using)
+    return found == expected
+
+
+def reinstall_missing(sender, using, **kwargs):
+    """После migrate восстанавливает триггеры, если миграция пересоздала
+    таблицу постов: сам индекс при этом остаётся, а триггеры пропадают.
+    Без таблицы индекса (миграция поиска откачена) ничего не делает."""
+    database = connections[using]
+    if not is_indexed(database):
+        return
+    found, expected = _schema_objects(database)
+    if TABLE in found and found != expected:
+        install(database)
+
+
+def uninstall(using=connection):
+    if not is_indexed(using):
+        return
+    with using.cursor() as cursor:
+        for suffix in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {TABLE}_{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def terms(query):
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def match_expression(query):
+    """Запрос FTS5: все слова запроса, каждое как префикс."""
+    return ' '.join(f'"{term}"*' for term in terms(query))
+
+
+def search_posts(queryset, query):
+    """Посты queryset, подходящие под query, с релевантностью в rank.
+
+    Отбор, ранжирование и сортировка выполняются одним запросом.
+    """
+    words = terms(query)
+    if not words or not is_indexed(connections[queryset.db]):
+        condition = Q()
+        for word in words:
+            condition &= Q(text__icontains=word)
+        queryset = queryset.annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+        return queryset.filter(condition) if words else queryset.none()
+    return queryset.extra(
+        tables=[TABLE],
+        where=[f'{TABLE}.rowid = {POSTS}.id', f'{TABLE} MATCH %s'],
+        params=[match_expression(query)],
+    ).annotate(rank=RawSQL(f'{TABLE}.rank', (), output_field=FloatField()))
@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import cache
+
+from . import counters, dependencies, tags
+from .models import Group, Post, User
+
+# Вход пользователя сохраняет только last_login, страницы от этого не меняются.
+LOGIN_ONLY = frozenset(('last_login',))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    relations = (instance.author_id, instance.group_id)
+    previous = getattr(instance, '_counted_relations', None)
+    instance._counted_relations = relations
+    if raw or counters.is_suspended():
+        return
+    tags.sync_posts([instance])
+    changed = {relations: 1}
+    if not created and previous not in (None, relations):
+        changed[previous] = -1
+    dependencies.invalidate_relations(changed, post_ids=[instance.pk])
+    if created or len(changed) > 1:
+        counters.apply(changed)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if counters.is_suspended():
+        return
+    relations = getattr(instance, '_counted_relations', None) or (
+        instance.author_id, instance.group_id
+    )
+    dependencies.invalidate_relations([relations], post_ids=[instance.pk])
+    counters.apply({relations: -1})
+
+
+def _remember_key(model, field, instance):
+    if instance.pk is None:
+        instance._cache_previous_key = None
+    else:
+        instance._cache_previous_key = model.objects.filter(
+            pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_key(Group, 'slug', instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    if not raw and update_fields != LOGIN_ONLY:
+        _remember_key(User, 'username', instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_cache_previous_key', None)}
+    cache.bump(
+        dependencies.group_info(instance.pk),
+        *(dependencies.group(slug) for slug in slugs - {None}),
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author(sender, instance, update_fields=None, **kwargs):
+    if update_fields == LOGIN_ONLY:
+        return
+    names = {instance.username, getattr(instance, '_cache_previous_key', None)}
+    cache.bump(
+        dependencies.author_info(instance.pk),
+        *(dependencies.author(name) for name in names - {None}),
+    )
@@ -0,0 +1,77 @@
+"""Хештеги в текстах постов и их обратный индекс PostTag."""
+import re
+from collections import defaultdict
+
+from .models import PostTag, Tag
+
+MAX_LENGTH = Tag._meta.get_field('name').max_length
+# Больше тегов в одном посте не индексируется.
+MAX_TAGS = 10
+
+HASHTAG_RE = re.compile(rf'(?<![\w#&])#(\w{{1,{MAX_LENGTH}}})(?!\w)')
+
+# Лента тега в порядке ленты постов: (pub_date, id) по убыванию.
+TAG_FEED_ORDERING = ('-pub_date', '-post_id')
+
+
+def normalize(name):
+    return name.casefold()
+
+
+def extract(text):
+    """Различные хештеги текста в порядке появления, без знака #."""
+    names = []
+    for match in HASHTAG_RE.finditer(text):
+        name = normalize(match.group(1))
+        if name not in names:
+            names.append(name)
+            if len(names) == MAX_TAGS:
+                break
+    return names
+
+
+def tag_ids(names):
+    """{имя: id} для names; недостающие теги создаются."""
+    ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = set(names) - ids.keys()
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        ids.update(
+            Tag.objects.filter(name__in=missing).values_list('name', 'id')
+        )
+    return ids
+
+
+def sync_posts(posts):
+    """Приводит PostTag в соответствие с текстами и датами posts.
+
+    Посты, у которых набор тегов и дата не изменились, не трогаются.
+    Возвращает число постов, чьи строки индекса были переписаны.
+    """
+    posts = {post.pk: post for post in posts if post.pk is not None}
+    if not posts:
+        return 0
+    wanted = {pk: set(extract(post.text)) for pk, post in posts.items()}
+    current = defaultdict(set)
+    stale = set()
+    rows = PostTag.objects.filter(post_id__in=posts).values_list(
+        'post_id', 'tag__name', 'pub_date'
+    )
+    for post_id, name, pub_date in rows:
+        current[post_id].add(name)
+        if pub_date != posts[post_id].pub_date:
+            stale.add(post_id)
+    changed = [
+        pk for pk in posts if wanted[pk] != current[pk] or pk in stale
+    ]
+    if not changed:
+        return 0
+    ids = tag_ids(set().union(*(wanted[pk] for pk in changed)))
+    PostTag.objects.filter(post_id__in=changed).delete()
+    PostTag.objects.bulk_create(
+        PostTag(post_id=pk, tag_id=ids[name], pub_date=posts[pk].pub_date)
+        for pk in changed for name in wanted[pk]
+    )
+    return len(changed)
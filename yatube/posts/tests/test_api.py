@@ -0,0 +1,126 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import personal
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(12)
+        )
+        cls.post = Post.objects.create(author=cls.user, text='Без группы')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_json(self, url, data=None, status=200):
+        response = self.guest_client.get(url, data)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_feeds_are_paginated_by_cursor(self):
+        """Ленты отдаются страницами со ссылками на соседние."""
+        urls = (
+            (reverse('api:index'), 13),
+            (reverse('api:group_posts', args=[self.group.slug]), 12),
+            (reverse('api:profile', args=[self.user.username]), 13),
+        )
+        for url, total in urls:
+            with self.subTest(url=url):
+                page = self.get_json(url)
+                self.assertEqual(len(page['results']), 10)
+                self.assertIsNone(page['previous'])
+                second = self.get_json(page['next'])
+                self.assertEqual(len(second['results']), total - 10)
+                self.assertIsNone(second['next'])
+                ids = [item['id'] for item in page['results']]
+                ids += [item['id'] for item in second['results']]
+                self.assertEqual(len(set(ids)), total)
+
+    def test_links_follow_host_of_request(self):
+        """Ссылки на страницы строятся от хоста и схемы каждого запроса,
+        а не того, чей ответ попал в кеш."""
+        url = reverse('api:index')
+        first = self.guest_client.get(url, HTTP_HOST='localhost').json()
+        second = self.guest_client.get(
+            url, HTTP_HOST='127.0.0.1', secure=True
+        ).json()
+        self.assertTrue(first['next'].startswith('http://localhost/'))
+        self.assertTrue(second['next'].startswith('https://127.0.0.1/'))
+
+    def test_feed_uses_one_query(self):
+        """Авторы и группы не выбираются отдельно для каждой записи."""
+        with self.assertNumQueries(1):
+            self.guest_client.get(reverse('api:index'))
+
+    def test_placeholders_in_post_text_are_not_stitched(self):
+        """Метка фрагмента в тексте поста остаётся в JSON как есть."""
+        marker = personal.placeholder('includes/header.html', {})
+        post = Post.objects.create(author=self.user, text=marker)
+        for url in (
+            reverse('api:index'),
+            reverse('api:post_detail', args=[post.pk]),
+        ):
+            with self.subTest(url=url):
+                self.assertIn(marker, json.dumps(self.get_json(url)))
+
+    def test_sparse_fields_and_compact_output(self):
+        """Можно выбрать поля; JSON без лишних пробелов."""
+        url = reverse('api:post_detail', args=[self.post.pk])
+        response = self.guest_client.get(url, {'fields': 'id,author,group'})
+        self.assertEqual(
+            response.content.decode(),
+            f'{{"id":{self.post.pk},"author":"auth","group":null}}'
+        )
+        error = self.get_json(url, {'fields': 'id,password'}, status=400)
+        self.assertIn('password', error['detail'])
+        post = self.get_json(url)
+        self.assertEqual(post['author_last_name'], 'Толстой')
+        self.assertEqual(post['text'], 'Без группы')
+
+    def test_missing_objects(self):
+        """Для несуществующих объектов — 404 в JSON."""
+        urls = (
+            reverse('api:post_detail', args=[10 ** 6]),
+            reverse('api:group_posts', args=['missing']),
+            reverse('api:profile', args=['missing']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.get_json(url, status=404), {'detail': 'Не найдено.'}
+                )
+
+    def test_export_streams_json_lines(self):
+        """Выгрузка отдаёт посты потоком по строке JSON на пост."""
+        response = self.guest_client.get(
+            reverse('api:export'),
+            {'group': self.group.slug, 'fields': 'id,group,pub_date'}
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(set(rows[0]), {'id', 'group', 'pub_date'})
+        self.assertEqual({row['group'] for row in rows}, {self.group.slug})
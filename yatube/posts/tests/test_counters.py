@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import counters
+from ..models import AuthorStats, Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='leo')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.group1 = Group.objects.create(
+            title='Другая группа',
+            slug='test-slug1',
+            description='Тестовое описание1'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_counters(self):
+        for group in (self.group, self.group1):
+            group.refresh_from_db()
+            self.assertEqual(group.posts_count, group.posts.count())
+        for user in (self.user, self.other):
+            stats = AuthorStats.objects.filter(author=user).first()
+            self.assertEqual(
+                stats.posts_count if stats else 0, user.posts.count()
+            )
+
+    def test_save_and_delete_keep_counters(self):
+        """Создание, смена группы и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group
+        )
+        self.assert_counters()
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group1
+        post.save()
+        self.assert_counters()
+        post.delete()
+        self.assert_counters()
+
+    def test_bulk_operations_keep_counters(self):
+        """Массовые операции QuerySet поддерживают счётчики."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}', group=self.group)
+            for i in range(5)
+        )
+        self.assert_counters()
+        Post.objects.filter(pk__in=Post.objects.values('pk')[:2]).update(
+            author=self.other, group=self.group1
+        )
+        self.assert_counters()
+        Post.objects.filter(author=self.user).delete()
+        self.assert_counters()
+
+    def test_missing_author_row_is_created_by_upsert(self):
+        """Строка счётчика автора создаётся и меняется одним запросом."""
+        Post.objects.create(author=self.user, text='Пост')
+        AuthorStats.objects.all().delete()
+        Post.objects.bulk_create([Post(author=self.user, text='Ещё пост')])
+        self.assert_counters()
+        with CaptureQueriesContext(connection) as queries:
+            counters.add_author_posts(self.user.pk, 2)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 4
+        )
+
+    def test_rebuild_counters_command(self):
+        """Команда rebuild_counters восстанавливает точные значения."""
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        Group.objects.update(posts_count=100)
+        AuthorStats.objects.all().delete()
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assert_counters()
+
+    def test_views_read_counters(self):
+        """Профиль и пост показывают счётчик без COUNT(*) по постам."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group
+        )
+        client = Client()
+        with self.assertNumQueries(1):
+            response = client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.id})
+            )
+        self.assertEqual(response.context['count'], 1)
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': self.user.username})
+        )
+        self.assertEqual(response.context['posts_count'], 1)
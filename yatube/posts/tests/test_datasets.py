@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import benchmarks, datasets, urls
+from ..models import AuthorStats, Group, Post
+
+
+class DatasetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generate_skewed_dataset(self):
+        """Набор создаётся пачками, с перекосом авторов и верными
+        счётчиками."""
+        progress = list(datasets.generate(
+            500, authors=20, groups=5, batch_size=200
+        ))
+        self.assertEqual(progress, [200, 400, 500])
+        self.assertEqual(Post.objects.count(), 500)
+        counts = list(AuthorStats.objects.order_by(
+            '-posts_count').values_list('posts_count', flat=True))
+        self.assertEqual(sum(counts), 500)
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+        for group in Group.objects.all():
+            self.assertEqual(group.posts_count, group.posts.count())
+        dates = list(Post.objects.order_by('pk').values_list(
+            'pub_date', flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLess(dates[0], dates[-1])
+
+    def test_benchmark_writes_results_for_every_url(self):
+        """Замер проходит по всем адресам posts и откатывает набор."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'results.json')
+        call_command(
+            'benchmark_views', '--sizes', '100', '--repeats', '1',
+            '--output', path, stdout=StringIO(), stderr=StringIO()
+        )
+        with open(path, encoding='utf-8') as file:
+            report = json.load(file)
+        [dataset] = report['datasets']
+        self.assertEqual(dataset['posts'], 100)
+        self.assertEqual(
+            set(dataset['results']),
+            {pattern.name for pattern in urls.urlpatterns}
+        )
+        for name, result in dataset['results'].items():
+            with self.subTest(url=name):
+                self.assertEqual(result['status'], 200)
+                if name not in benchmarks.LOGIN_REQUIRED:
+                    self.assertEqual(result['warm']['queries'], 0)
+                self.assertGreater(result['cold']['peak_memory_kib'], 0)
+        self.assertFalse(Post.objects.exists())
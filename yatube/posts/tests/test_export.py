@@ -0,0 +1,72 @@
+import gzip
+import json
+import os
+import re
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(5)
+        )
+
+    def export(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('export_posts', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def watermark(self, report):
+        return re.search(r'--since: (\S+)', report).group(1)
+
+    def test_stdout_in_chunks(self):
+        """Выгрузка в stdout идёт пачками по ключу, по запросу на пачку."""
+        with self.assertNumQueries(3):
+            out, err = self.export('--chunk-size=2')
+        rows = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(
+            [row['text'] for row in rows], [f'Пост {n}' for n in range(5)]
+        )
+        self.assertEqual(rows[0]['author_first_name'], 'Лев')
+        self.assertEqual(rows[0]['group'], 'test-slug')
+        self.assertIn('Готово: 5 постов', err)
+
+    def test_gzip_file_and_since(self):
+        """Файл .gz сжимается, с --since выгружаются только новые посты."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'posts.jsonl.gz')
+        out, _ = self.export(path)
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 5)
+        Post.objects.create(author=self.user, text='Новый пост')
+        new, err = self.export('--since', self.watermark(out))
+        self.assertEqual(
+            [json.loads(line)['text'] for line in new.splitlines()],
+            ['Новый пост']
+        )
+        empty, _ = self.export('--since', self.watermark(err))
+        self.assertEqual(empty, '')
+        last = Post.objects.order_by('pub_date').last()
+        since = last.pub_date.isoformat()
+        self.assertEqual(self.export('--since', since)[0], '')
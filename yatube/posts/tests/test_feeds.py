@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class SyndicationFeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Другое описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост в группе', group=cls.group
+        )
+        cls.urls = {
+            'index_rss': reverse('posts:index_rss'),
+            'index_atom': reverse('posts:index_atom'),
+            'group_rss': reverse('posts:group_rss', args=[cls.group.slug]),
+            'group_atom': reverse('posts:group_atom', args=[cls.group.slug]),
+            'profile_rss': reverse('posts:profile_rss', args=['auth']),
+            'profile_atom': reverse('posts:profile_atom', args=['auth']),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_list_posts(self):
+        """Ленты RSS и Atom содержат посты своей области."""
+        for name, url in self.urls.items():
+            with self.subTest(feed=name):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                content_type = 'atom' if name.endswith('atom') else 'rss'
+                self.assertIn(content_type, response['Content-Type'])
+                self.assertContains(response, 'Пост в группе')
+                self.assertContains(
+                    response, reverse('posts:post_detail', args=[self.post.pk])
+                )
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_links_follow_host_of_request(self):
+        """Ссылки в ленте строятся от хоста и схемы каждого запроса."""
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                self.guest_client.get(url, HTTP_HOST='localhost')
+                response = self.guest_client.get(
+                    url, HTTP_HOST='127.0.0.1', secure=True
+                )
+                content = response.content.decode()
+                self.assertIn('https://127.0.0.1/', content)
+                self.assertNotIn('localhost', content)
+
+    def test_feeds_are_cached_with_conditional_get(self):
+        """Повторный опрос отдаётся из кеша, с ETag — ответом 304."""
+        for name, url in self.urls.items():
+            with self.subTest(feed=name):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_new_post_invalidates_feeds_of_its_scope(self):
+        """Новый пост сбрасывает ленты своей области и только их."""
+        etags = {
+            name: self.guest_client.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        other_url = reverse('posts:group_rss', args=[self.other_group.slug])
+        other_etag = self.guest_client.get(other_url)['ETag']
+        Post.objects.create(author=self.user, text='Новый', group=self.group)
+        for name, url in self.urls.items():
+            with self.subTest(feed=name):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый')
+        response = self.guest_client.get(
+            other_url, HTTP_IF_NONE_MATCH=other_etag
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+FEED_TEMPLATE = (
+    '{% load fragments %}{% for post in posts %}'
+    '{% cache_fragment post in posts %}'
+    '{{ post.text }}/{{ post.author.username }}/{{ post.group.title }}'
+    '{% endcache_fragment %}{% if not forloop.last %}|{% endif %}'
+    '{% endfor %}'
+)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='leo')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Первый', group=cls.group
+        )
+        cls.post1 = Post.objects.create(author=cls.other, text='Второй')
+
+    def setUp(self):
+        cache.clear()
+        self.template = Template(FEED_TEMPLATE)
+
+    def render(self):
+        posts = Post.objects.for_feed().order_by('id')
+        return self.template.render(Context({'posts': posts}))
+
+    def test_fragments_are_rendered_and_joined(self):
+        """Фрагменты рендерятся внутри обычного цикла."""
+        self.assertEqual(
+            self.render(), 'Первый/auth/Тестовая группа|Второй/leo/'
+        )
+
+    def test_page_costs_two_cache_round_trips(self):
+        """Версии авторов и групп и все фрагменты страницы читаются двумя
+        get_many()."""
+        self.render()
+        with mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many, mock.patch.object(cache, 'set_many') as set_many:
+            self.render()
+        self.assertEqual(get_many.call_count, 2)
+        set_many.assert_not_called()
+
+    def test_change_invalidates_own_fragment_only(self):
+        """Изменение поста, группы или автора сбрасывает только их посты."""
+        self.render()
+        changes = (
+            lambda: Post.objects.filter(pk=self.post.pk).update(text='Новый'),
+            lambda: Group.objects.filter(pk=self.group.pk).first().save(),
+            lambda: User.objects.get(pk=self.user.pk).save(),
+        )
+        for change in changes:
+            with self.subTest(change=change):
+                self.render()
+                change()
+                with mock.patch.object(
+                    cache, 'set_many', wraps=cache.set_many
+                ) as set_many:
+                    self.render()
+                rendered = set_many.call_args[0][0]
+                self.assertEqual(len(rendered), 1)
+                self.assertIn(f':{self.post.pk}:', next(iter(rendered)))
+
+    def test_author_and_group_changes_keep_post_rows(self):
+        """Правка автора или группы не переписывает даты изменения постов
+        и всё равно показывает новые имя и название."""
+        self.render()
+        updated = Post.objects.get(pk=self.post.pk).updated
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'tolstoy'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новая группа'
+        group.save()
+        self.assertEqual(Post.objects.get(pk=self.post.pk).updated, updated)
+        self.assertEqual(
+            self.render(), 'Первый/tolstoy/Новая группа|Второй/leo/'
+        )
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import AuthorStats, Group, Post, PostTag
+
+User = get_user_model()
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_posts(self, *args, stdin=None):
+        out, err = StringIO(), StringIO()
+        with mock.patch('sys.stdin', stdin or StringIO()):
+            call_command('import_posts', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_jsonl_from_stdin(self):
+        """JSON Lines из stdin: авторы и группы создаются, даты сохраняются."""
+        records = [
+            {'text': 'Старый пост #архив', 'author': 'auth',
+             'group': 'test-slug', 'pub_date': '2020-01-02T03:04:05+00:00'},
+            {'text': 'Пост нового автора', 'author': 'leo',
+             'author_first_name': 'Лев', 'group': 'new-group',
+             'group_title': 'Новая группа'},
+            {'text': 'Без автора'},
+            {'text': 'Неверная группа', 'author': 'auth', 'group': 'my group'},
+            {'text': 'Неверный автор', 'author': 'bad user/x'},
+            [],
+        ]
+        lines = '\n'.join(json.dumps(record) for record in records)
+        out, err = self.import_posts(
+            '-', '--batch-size=2', stdin=StringIO(lines + '\nне json\n')
+        )
+        self.assertIn('Готово: 2 постов', out)
+        self.assertIn('пропущено строк: 5', out)
+        self.assertEqual(err.count('пропущена'), 5)
+        self.assertIn("неверное поле slug: 'my group'", err)
+        self.assertFalse(Group.objects.filter(slug='my group').exists())
+        self.assertFalse(User.objects.filter(username='bad user/x').exists())
+        old = Post.objects.get(text='Старый пост #архив')
+        self.assertEqual(old.pub_date.year, 2020)
+        self.assertEqual(old.updated, old.pub_date)
+        self.assertEqual(old.group, self.group)
+        self.assertTrue(PostTag.objects.filter(post=old).exists())
+        leo = User.objects.get(username='leo')
+        self.assertEqual(leo.first_name, 'Лев')
+        self.assertFalse(leo.has_usable_password())
+        new_group = Group.objects.get(slug='new-group')
+        self.assertEqual(new_group.title, 'Новая группа')
+        self.assertEqual(new_group.posts_count, 1)
+        self.assertEqual(AuthorStats.objects.get(author=leo).posts_count, 1)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+
+    def test_csv_file(self):
+        """CSV читается из файла пачками, без запросов на каждую строку."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'posts.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write('text,author,group\n')
+            for number in range(50):
+                file.write(f'Пост {number},auth,test-slug\n')
+        with CaptureQueriesContext(connection) as queries:
+            out, _ = self.import_posts(path, '--batch-size=25')
+        self.assertLess(len(queries), 50)
+        self.assertIn('Готово: 50 постов', out)
+        self.assertEqual(self.group.posts.count(), 50)
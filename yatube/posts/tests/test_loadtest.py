@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from .. import loadtest
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    """Нагрузка идёт из потоков, поэтому данные должны быть
+    закоммичены."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number} #тег',
+                 group=self.group)
+            for number in range(15)
+        )
+
+    def test_mixed_load_reports_every_url(self):
+        """Все сценарии проходят без ошибок, посты нагрузки удаляются."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'load.json')
+        out = StringIO()
+        call_command(
+            'load_test', '--concurrency=2', '--iterations=6',
+            '--mix=feed=1,browse=1,write=2', f'--output={path}',
+            stdout=out, stderr=StringIO()
+        )
+        with open(path, encoding='utf-8') as file:
+            report = json.load(file)
+        # Общая in-memory база тестов не ждёт блокировку, а сразу
+        # отвечает «table is locked»: других ошибок быть не должно.
+        self.assertEqual(
+            report['total']['error_rate'], report['total']['lock_error_rate']
+        )
+        for name in ('login', 'post_create', 'post_edit'):
+            with self.subTest(url=name):
+                self.assertIn(name, report['urls'])
+                self.assertGreater(report['urls'][name]['p99_ms'], 0)
+        self.assertIn('всего', out.getvalue())
+        self.assertEqual(Post.objects.count(), 15)
+        self.assertEqual(Group.objects.get().posts_count, 15)
+
+    def test_mix_is_validated(self):
+        """Неизвестные сценарии и веса отклоняются."""
+        for mix in ('feed=1,crawl=1', 'feed=x', 'feed=0'):
+            with self.subTest(mix=mix):
+                with self.assertRaises(CommandError):
+                    call_command('load_test', f'--mix={mix}')
+
+    def test_wsgi_client_keeps_cookies(self):
+        """Клиент хранит cookies и передаёт путь в кодировке WSGI."""
+        from yatube.wsgi import application
+
+        client = loadtest.WSGIClient(application)
+        status, _, _, error = client.request(
+            'GET', '/tag/%D1%82%D0%B5%D0%B3/'
+        )
+        self.assertEqual(status, 200)
+        self.assertIsNone(error)
+        client.request('GET', '/auth/login/')
+        self.assertIn('csrftoken', client.cookies)
@@ -0,0 +1,177 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core import personal
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.group1 = Group.objects.create(
+            title='Другая группа',
+            slug='test-slug1',
+            description='Тестовое описание1'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_posts', kwargs={'slug': cls.group.slug}
+            ),
+            'group1': reverse(
+                'posts:group_posts', kwargs={'slug': cls.group1.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user.username}
+            ),
+            'detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.id}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        for url in self.urls.values():
+            self.guest_client.get(url)
+
+    def assert_cached(self, *names):
+        for name in names:
+            with self.subTest(page=name), self.assertNumQueries(0):
+                self.guest_client.get(self.urls[name])
+
+    def assert_not_cached(self, *names):
+        for name in names:
+            with self.subTest(page=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertIsNotNone(response.context)
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный анонимный запрос не обращается к базе."""
+        self.assert_cached('index', 'group', 'group1', 'profile', 'detail')
+
+    def test_unknown_query_params_share_the_page(self):
+        """Посторонние параметры запроса не создают новых записей в кеше."""
+        for query in ('?x=1', '?x=2&utm_source=mail'):
+            with self.subTest(query=query), self.assertNumQueries(0):
+                response = self.guest_client.get(self.urls['index'] + query)
+                self.assertEqual(response.status_code, 200)
+        response = self.guest_client.get(self.urls['index'] + '?page=2')
+        self.assertIsNotNone(response.context)
+
+    def test_cached_page_is_personalized(self):
+        """Общая страница из кеша получает персональные фрагменты."""
+        response = self.authorized_client.get(self.urls['detail'])
+        self.assertNotIn('post', response.context)
+        self.assertContains(response, 'Пользователь: auth')
+        self.assertContains(response, 'редактировать запись')
+        other = Client()
+        other.force_login(User.objects.create_user(username='leo'))
+        response = other.get(self.urls['detail'])
+        self.assertContains(response, 'Пользователь: leo')
+        self.assertNotContains(response, 'редактировать запись')
+        response = self.guest_client.get(self.urls['detail'])
+        self.assertContains(response, 'Войти')
+        self.assertNotContains(response, 'Пользователь:')
+
+    def test_only_signed_allowed_placeholders_are_stitched(self):
+        """Метки из текста поста и шаблоны вне списка не рендерятся."""
+        request = RequestFactory().get('/')
+        request.user = self.user
+        signed = personal.placeholder('includes/header.html', {})
+        self.assertIn('Пользователь: auth', personal.stitch(request, signed))
+        payload = signed[len('<!--personal:'):-len('-->')].split(':')[0]
+        forged = base64.urlsafe_b64encode(b'["missing.html",{}]').decode()
+        for content in (
+            f'<!--personal:{forged}:abc-->',
+            f'<!--personal:{payload}:abc-->',
+        ):
+            with self.subTest(content=content):
+                self.assertEqual(personal.stitch(request, content), content)
+        with self.assertRaises(ValueError):
+            personal.placeholder('missing.html', {})
+
+    def test_new_post_invalidates_its_pages_only(self):
+        """Новый пост сбрасывает главную, свою группу и профиль автора."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Новый пост', 'group': self.group.id},
+        )
+        self.assert_not_cached('index', 'group', 'profile', 'detail')
+        self.assert_cached('group1')
+
+    def test_edit_moves_post_between_groups(self):
+        """Смена группы поста сбрасывает страницы обеих групп."""
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'Изменённый текст', 'group': self.group1.id},
+        )
+        self.assert_not_cached('index', 'group', 'group1', 'detail')
+        response = self.guest_client.get(self.urls['detail'])
+        self.assertContains(response, 'Изменённый текст')
+
+    def test_group_change_invalidates_pages_showing_it(self):
+        """Изменение группы сбрасывает страницы, где она показана."""
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assert_not_cached('group', 'index', 'profile', 'detail')
+        self.assert_cached('group1')
+
+    def test_unchanged_page_is_not_modified(self):
+        """Повторный запрос с ETag получает 304 без рендера и запросов."""
+        for name in self.urls:
+            with self.subTest(page=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertNumQueries(0), \
+                        self.assertTemplateNotUsed('includes/header.html'):
+                    not_modified = self.guest_client.get(
+                        self.urls[name],
+                        HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified['ETag'], response['ETag'])
+                self.assertEqual(not_modified.content, b'')
+
+    def test_if_modified_since_is_honoured(self):
+        """Без ETag страница сверяется по Last-Modified."""
+        response = self.guest_client.get(self.urls['index'])
+        not_modified = self.guest_client.get(
+            self.urls['index'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_etag_changes_with_content_and_visitor(self):
+        """Новый пост или другой посетитель — другой ETag."""
+        etag = self.guest_client.get(self.urls['index'])['ETag']
+        response = self.authorized_client.get(
+            self.urls['index'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Пользователь: auth')
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest_client.get(
+            self.urls['index'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
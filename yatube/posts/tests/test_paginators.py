@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Post
+from ..paginators import FeedPaginator
+
+User = get_user_model()
+
+
+class FeedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост {i}')
+            for i in range(30)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_links_window(self):
+        """Ссылки на страницы ограничены окном вокруг текущей."""
+        paginator = FeedPaginator(Post.objects.all(), 1)
+        self.assertEqual(
+            paginator.page_links(15), [1, None, 13, 14, 15, 16, 17, None, 30]
+        )
+        self.assertEqual(paginator.page_links(1), [1, 2, 3, None, 30])
+
+    def test_count_hint_skips_count_query(self):
+        """Подсказка count избавляет от COUNT(*)."""
+        paginator = FeedPaginator(Post.objects.all(), 10, count=30)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.num_pages, 3)
+
+    def test_count_is_cached(self):
+        """Число записей берётся из кеша до истечения срока."""
+        FeedPaginator(Post.objects.all(), 10).count
+        paginator = FeedPaginator(Post.objects.all(), 10)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 30)
+        self.assertTrue(paginator.count_is_estimate)
+
+    def test_stale_count_is_refreshed(self):
+        """Устаревшее число не мешает открыть существующую страницу."""
+        FeedPaginator(Post.objects.all(), 10).count
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Новый пост {i}') for i in range(10)
+        )
+        page = FeedPaginator(Post.objects.all(), 10).get_page(4)
+        self.assertEqual(page.number, 4)
+        self.assertEqual(len(page), 10)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from core import querycache
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class QueryCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        querycache.reset_stats()
+
+    def test_get_is_cached_and_counted(self):
+        """Повторный get() не обращается к базе и считается попаданием."""
+        Group.objects.cached().get(slug=self.group.slug)
+        with self.assertNumQueries(0):
+            group = Group.objects.cached().get(slug=self.group.slug)
+        self.assertEqual(group, self.group)
+        self.assertEqual(
+            querycache.stats()['posts.Group'], {'hits': 1, 'misses': 1}
+        )
+
+    def test_missing_object_is_cached(self):
+        """Отсутствие объекта тоже кешируется до появления объекта."""
+        for _ in range(2):
+            with self.assertRaises(Group.DoesNotExist):
+                Group.objects.cached().get(slug='missing')
+        self.assertEqual(querycache.stats()['posts.Group']['hits'], 1)
+        Group.objects.create(title='Новая', slug='missing', description='-')
+        self.assertEqual(
+            Group.objects.cached().get(slug='missing').title, 'Новая'
+        )
+
+    def test_save_and_bulk_update_invalidate_table(self):
+        """Сохранение и массовое обновление сбрасывают кеш таблицы."""
+        Group.objects.cached().get(slug=self.group.slug)
+        Post.objects.create(author=self.user, text='Ещё', group=self.group)
+        group = Group.objects.cached().get(slug=self.group.slug)
+        self.assertEqual(group.posts_count, 2)
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        self.assertEqual(
+            Group.objects.cached().get(slug=self.group.slug).title,
+            'Новое название'
+        )
+
+    def test_pk_lookup_depends_on_row_only(self):
+        """Поиск по pk не сбрасывается изменением других строк."""
+        Post.objects.cached().get(pk=self.post.pk)
+        Post.objects.create(author=self.user, text='Другой пост')
+        with self.assertNumQueries(0):
+            Post.objects.cached().get(pk=self.post.pk)
+        Post.objects.filter(pk=self.post.pk).first().save()
+        with self.assertNumQueries(1):
+            Post.objects.cached().get(pk=self.post.pk)
+
+    def test_bulk_operations_invalidate_pk_lookups(self):
+        """Массовые update() и delete() сбрасывают и поиск по pk."""
+        Post.objects.cached().get(pk=self.post.pk)
+        Post.objects.filter(pk=self.post.pk).update(text='Новый текст')
+        self.assertEqual(
+            Post.objects.cached().get(pk=self.post.pk).text, 'Новый текст'
+        )
+        Post.objects.filter(pk=self.post.pk).delete()
+        with self.assertRaises(Post.DoesNotExist):
+            Post.objects.cached().get(pk=self.post.pk)
+
+    def test_joined_tables_are_dependencies(self):
+        """Изменение связанной таблицы сбрасывает запрос с JOIN."""
+        queryset = querycache.cached(User).select_related('post_stats')
+        self.assertEqual(
+            queryset.get(username='auth').post_stats.posts_count, 1
+        )
+        Post.objects.create(author=self.user, text='Ещё')
+        self.assertEqual(
+            queryset.get(username='auth').post_stats.posts_count, 2
+        )
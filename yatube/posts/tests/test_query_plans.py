@@ -0,0 +1,77 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Group, Post
+from ..paginators import FEED_ORDERING, keyset_filter
+
+User = get_user_model()
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN для SQLite')
+class FeedQueryPlanTests(TestCase):
+    """Запросы лент читают индекс по порядку, без полного скана и сортировки.
+
+    Таблицы почти пусты, поэтому проверяется выбор плана, а не скорость.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_uses_index(self, queryset, index_name):
+        plan = self.query_plan(queryset)
+        details = '\n'.join(plan)
+        self.assertFalse(
+            any('TEMP B-TREE' in step for step in plan),
+            f'Сортировка во временном дереве:\n{details}'
+        )
+        post_steps = [step for step in plan if ' posts_post ' in f'{step} ']
+        self.assertTrue(post_steps, details)
+        for step in post_steps:
+            self.assertIn(
+                index_name, step, f'Не использован индекс:\n{details}'
+            )
+
+    def feed_queries(self):
+        cursor = keyset_filter(FEED_ORDERING, [timezone.now(), 100])
+        return {
+            'post_feed_idx': Post.objects.for_feed(),
+            'post_group_feed_idx': self.group.posts.for_feed(),
+            'post_author_feed_idx': self.user.posts.for_feed(),
+        }, cursor
+
+    def test_first_pages_use_feed_indexes(self):
+        """Первая страница каждой ленты идёт по своему индексу."""
+        queries, _ = self.feed_queries()
+        for index_name, queryset in queries.items():
+            with self.subTest(index=index_name):
+                self.assert_uses_index(
+                    queryset.order_by(*FEED_ORDERING)[:10], index_name
+                )
+
+    def test_keyset_pages_use_feed_indexes(self):
+        """Страница после курсора тоже не требует скана и сортировки."""
+        queries, cursor = self.feed_queries()
+        for index_name, queryset in queries.items():
+            with self.subTest(index=index_name):
+                self.assert_uses_index(
+                    queryset.filter(cursor).order_by(*FEED_ORDERING)[:10],
+                    index_name
+                )
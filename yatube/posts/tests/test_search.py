@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import search
+from ..models import Post
+from ..search import SEARCH_ORDERING, match_expression, search_posts
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Кошки спят. Кошки едят. Кошки гуляют.'
+        )
+        cls.cat_and_dog = Post.objects.create(
+            author=cls.user, text='Кошка и собака живут в одном доме.'
+        )
+        cls.dog = Post.objects.create(author=cls.user, text='Собака лает')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def search(self, query):
+        return list(search_posts(Post.objects.all(), query).order_by(
+            *SEARCH_ORDERING
+        ))
+
+    def test_match_expression_is_safe(self):
+        """Запрос пользователя не может сломать синтаксис FTS5."""
+        self.assertEqual(match_expression('Кот" OR *('), '"кот"* "or"*')
+        self.assertEqual(self.search('" AND ( NEAR'), [])
+        self.assertEqual(self.search('  '), [])
+
+    def test_results_are_ranked(self):
+        """Находятся все формы слова по префиксу, лучшие совпадения выше."""
+        self.assertEqual(self.search('кош'), [self.cats, self.cat_and_dog])
+        self.assertEqual(self.search('кошка собака'), [self.cat_and_dog])
+
+    def test_index_follows_changes(self):
+        """Индекс видит правку, удаление и массовое создание постов."""
+        self.dog.text = 'Попугай говорит'
+        self.dog.save()
+        self.assertEqual(self.search('попугай'), [self.dog])
+        self.assertEqual(self.search('лает'), [])
+        Post.objects.filter(pk=self.dog.pk).update(text='Хомяк спит')
+        self.assertEqual(self.search('хомяк'), [self.dog])
+        self.dog.delete()
+        self.assertEqual(self.search('хомяк'), [])
+        Post.objects.bulk_create([Post(author=self.user, text='Хомяк ест')])
+        self.assertEqual(len(self.search('хомяк')), 1)
+
+    def test_lost_triggers_are_restored_after_migrate(self):
+        """post_migrate восстанавливает триггеры, которые потеряла
+        пересозданная таблица постов, и перестраивает индекс."""
+        self.assertTrue(search.is_installed())
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {search.TABLE}_insert')
+        self.assertFalse(search.is_installed())
+        Post.objects.create(author=self.user, text='Хомяк без индекса')
+        search.reinstall_missing(sender=None, using=DEFAULT_DB_ALIAS)
+        self.assertTrue(search.is_installed())
+        self.assertEqual(len(self.search('хомяк')), 1)
+
+    def test_search_page(self):
+        """Страница поиска получает результаты одним запросом."""
+        url = reverse('posts:search')
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(url, {'q': 'кош'})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(
+            list(response.context['page_obj']), [self.cats, self.cat_and_dog]
+        )
+        self.assertContains(response, 'value="кош"')
+        response = self.guest_client.get(url)
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertNotContains(response, 'Ничего не найдено')
+
+    def test_search_pages_keep_query(self):
+        """Ссылки на соседние страницы сохраняют запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Собака номер {number}')
+            for number in range(12)
+        )
+        url = reverse('posts:search')
+        response = self.guest_client.get(url, {'q': 'собака'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertContains(
+            response, '?q=%D1%81%D0%BE%D0%B1%D0%B0%D0%BA%D0%B0&amp;'
+            f'after={page_obj.next_cursor}'
+        )
+        response = self.guest_client.get(
+            url, {'q': 'собака', 'after': page_obj.next_cursor}
+        )
+        second = list(response.context['page_obj'])
+        self.assertEqual(len(second), 4)
+        self.assertFalse(set(second) & set(page_obj))
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт по тому же индексу."""
+        admin = Client()
+        admin.force_login(User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        ))
+        response = admin.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собака'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.cat_and_dog, self.dog}
+        )
+        self.assertIn(
+            'posts_post_fts', str(response.context['cl'].queryset.query)
+        )
@@ -0,0 +1,102 @@
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, PostTag, Tag
+from ..paginators import keyset_filter
+from ..tags import TAG_FEED_ORDERING, extract
+
+User = get_user_model()
+
+
+class TagsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Прогулка #Кошки #собаки'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def post_tags(self, post):
+        return set(PostTag.objects.filter(post=post).values_list(
+            'tag__name', flat=True
+        ))
+
+    def test_extract(self):
+        """Хештеги приводятся к нижнему регистру и не повторяются."""
+        self.assertEqual(
+            extract('#Кошки и #кошки, #dog_1. mail#box &#35; ##x #'),
+            ['кошки', 'dog_1']
+        )
+
+    def test_save_and_bulk_operations_update_index(self):
+        """Сохранение, массовые создание и правка обновляют индекс."""
+        self.assertEqual(self.post_tags(self.post), {'кошки', 'собаки'})
+        self.post.text = 'Только #кошки'
+        self.post.save()
+        self.assertEqual(self.post_tags(self.post), {'кошки'})
+        Post.objects.filter(pk=self.post.pk).update(text='#попугаи')
+        self.assertEqual(self.post_tags(self.post), {'попугаи'})
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'#новый{number}')
+            for number in range(3)
+        )
+        self.assertEqual(
+            set(Tag.objects.values_list('name', flat=True)),
+            {'кошки', 'собаки', 'попугаи', 'новый0', 'новый1', 'новый2'}
+        )
+        self.post.delete()
+        self.assertEqual(PostTag.objects.count(), 3)
+
+    def test_tag_page(self):
+        """Лента тега постранично показывает посты с этим тегом."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number} #кошки')
+            for number in range(10)
+        )
+        Post.objects.create(author=self.user, text='Без тегов')
+        url = reverse('posts:tag_posts', kwargs={'name': 'КОШКИ'})
+        response = self.guest_client.get(url)
+        page_obj = response.context['page_obj']
+        expected = list(Post.objects.exclude(text='Без тегов'))
+        self.assertEqual(list(page_obj), expected[:10])
+        self.assertContains(response, '#кошки')
+        response = self.guest_client.get(url, {'after': page_obj.next_cursor})
+        self.assertEqual(list(response.context['page_obj']), expected[10:])
+        response = self.guest_client.get(
+            reverse('posts:tag_posts', kwargs={'name': 'нет'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN для SQLite')
+    def test_tag_feed_reads_index(self):
+        """Лента тега читает индекс (tag, pub_date) без сортировки."""
+        tag = Tag.objects.get(name='кошки')
+        rows = tag.post_tags.for_feed().order_by(*TAG_FEED_ORDERING)
+        cursor = keyset_filter(TAG_FEED_ORDERING, [self.post.pub_date, 1])
+        for queryset in (rows, rows.filter(cursor)):
+            sql, params = queryset[:10].query.sql_with_params()
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = '\n'.join(row[-1] for row in db_cursor.fetchall())
+            self.assertIn('post_tag_feed_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_backfill_command(self):
+        """Команда заполняет индекс для существующих постов."""
+        PostTag.objects.all().delete()
+        out = StringIO()
+        call_command('backfill_tags', '--batch-size=1', stdout=out)
+        self.assertEqual(self.post_tags(self.post), {'кошки', 'собаки'})
+        self.assertIn('обновлено 1 постов', out.getvalue())
@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
@@ -25,6 +28,7 @@ class PostPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -150,6 +154,7 @@ class PaginatorViewsTest(TestCase):
         Post.objects.bulk_create(objs=posts)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.author = Client()
         self.author.force_login(self.user)
@@ -163,3 +168,90 @@ class PaginatorViewsTest(TestCase):
         """Паджинатор тест страницы 2."""
         response = self.author.get(reverse('posts:index') + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 4)
+
+    def test_keyset_pages_cover_feed(self):
+        """Курсорные страницы «Старше»/«Новее» проходят всю ленту."""
+        first = self.guest_client.get(reverse('posts:index'))
+        first_page = first.context['page_obj']
+        self.assertFalse(first_page.has_previous())
+        self.assertTrue(first_page.has_next())
+        second = self.guest_client.get(
+            reverse('posts:index'), {'after': first_page.next_cursor}
+        )
+        second_page = second.context['page_obj']
+        self.assertEqual(len(second_page), 4)
+        self.assertFalse(second_page.has_next())
+        seen = [post.id for post in first_page] + [
+            post.id for post in second_page
+        ]
+        self.assertEqual(
+            seen, list(
+                Post.objects.order_by('-pub_date', '-id')
+                .values_list('id', flat=True)
+            )
+        )
+        back = self.guest_client.get(
+            reverse('posts:index'), {'before': second_page.previous_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in back.context['page_obj']],
+            [post.id for post in first_page],
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор отдаёт первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'after': 'not-a-cursor'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.create(author=cls.user, text='Первый', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def add_posts(self, count):
+        for i in range(count):
+            author = User.objects.create_user(username=f'author{i}')
+            group = Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i}', description='-'
+            )
+            Post.objects.create(author=author, text=f'Пост {i}', group=group)
+            Post.objects.create(
+                author=self.user, text=f'Пост в группе {i}', group=self.group
+            )
+            Post.objects.create(
+                author=self.user, text=f'Пост {i}', group=group
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feed_queries_do_not_depend_on_page_size(self):
+        """Число запросов ленты не зависит от числа постов на странице."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        before = {url: self.count_queries(url) for url in urls}
+        self.add_posts(10)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), before[url])
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class WarmCacheCommandTests(TransactionTestCase):
+    """Команда прогрева рендерит страницы в потоках, поэтому данные
+    должны быть закоммичены."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}', group=self.group)
+            for number in range(15)
+        )
+        self.post = Post.objects.first()
+
+    def test_warmed_pages_are_served_without_queries(self):
+        """После прогрева страницы отдаются из кеша без запросов к базе."""
+        out = StringIO()
+        call_command('warm_cache', '--workers=2', stdout=out, stderr=out)
+        output = out.getvalue()
+        self.assertIn('Прогрето страниц: 19 из 19', output)
+        for url_name in ('index', 'group_posts', 'profile', 'post_detail'):
+            self.assertIn(url_name, output)
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
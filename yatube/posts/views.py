@@ -1,64 +1,125 @@
-from django.core.paginator import Paginator
+from core import querycache
+from core.cache import add_dependencies, cache_shared_page
 from posts.forms import PostForm
-from .models import Post, Group, User
+from . import counters, dependencies, tags
+from .models import Post, Group, Tag, User
+from .paginators import FEED_ORDERING, KeysetPaginator
+from .search import SEARCH_ORDERING, search_posts
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
+from django.utils.http import urlencode
 
 MAX_POSTS: int = 10
 
 
-def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, MAX_POSTS)
+def get_page_obj(request, posts, count=None, ordering=FEED_ORDERING):
+    """Страница ленты: по курсору, а для ?page=N — по номеру."""
+    paginator = KeysetPaginator(
+        posts, MAX_POSTS, ordering=ordering, count=count
+    )
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+
+
+@cache_shared_page(lambda request: [dependencies.FEED])
+def index(request):
+    posts = Post.objects.for_feed()
+    page_obj = get_page_obj(request, posts)
     context = {
         'page_obj': page_obj,
     }
-    return render(
+    response = render(
         request, 'posts/index.html', context
     )
+    return add_dependencies(response, *dependencies.for_posts(page_obj))
 
 
+@cache_shared_page(
+    lambda request, slug: [dependencies.group(slug)]
+)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, MAX_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = get_object_or_404(Group.objects.cached(), slug=slug)
+    posts = group.posts.for_feed()
+    page_obj = get_page_obj(request, posts, count=group.posts_count)
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(
+    response = render(
         request, 'posts/group_list.html', context
     )
+    return add_dependencies(response, *dependencies.for_posts(page_obj))
 
 
+@cache_shared_page(
+    lambda request, username: [dependencies.author(username)]
+)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    posts_count = posts.count()
-    paginator = Paginator(posts, MAX_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        querycache.cached(User).select_related('post_stats'),
+        username=username
+    )
+    posts = author.posts.for_feed()
+    posts_count = counters.posts_count(author)
+    page_obj = get_page_obj(request, posts, count=posts_count)
     context = {
         'author': author,
         'page_obj': page_obj,
         'posts_count': posts_count,
     }
-    return render(request, 'posts/profile.html', context)
+    response = render(request, 'posts/profile.html', context)
+    return add_dependencies(response, *dependencies.for_posts(page_obj))
 
 
+@cache_shared_page(
+    lambda request, post_id: [dependencies.post(post_id)]
+)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    count = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__post_stats').cached(),
+        id=post_id
+    )
+    count = counters.posts_count(post.author)
     context = {
         'post': post,
         'count': count
     }
-    return render(request, 'posts/post_detail.html', context)
+    response = render(request, 'posts/post_detail.html', context)
+    return add_dependencies(response, *dependencies.for_posts([post]))
+
+
+@cache_shared_page(lambda request, name: [dependencies.FEED])
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag.objects.cached(), name=tags.normalize(name))
+    rows = tag.post_tags.for_feed()
+    page_obj = get_page_obj(request, rows, ordering=tags.TAG_FEED_ORDERING)
+    page_obj.object_list = [row.post for row in page_obj]
+    context = {
+        'tag': tag,
+        'page_obj': page_obj,
+    }
+    response = render(request, 'posts/tag_list.html', context)
+    return add_dependencies(response, *dependencies.for_posts(page_obj))
+
+
+@cache_shared_page(lambda request: [dependencies.FEED])
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(Post.objects.for_feed(), query)
+    page_obj = get_page_obj(request, posts, ordering=SEARCH_ORDERING)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': f'{urlencode({"q": query})}&' if query else '',
+    }
+    response = render(request, 'posts/search.html', context)
+    return add_dependencies(response, *dependencies.for_posts(page_obj))
 
 
 @login_required
@@ -76,8 +137,9 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
+    # Форма сохраняет все поля экземпляра: он читается из базы, не из кеша.
     post = get_object_or_404(Post, id=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(request.POST or None, instance=post)
     if request.method == 'POST':
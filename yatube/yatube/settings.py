@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
+    'core.memory.MemoryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiler.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -63,7 +67,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -92,6 +96,96 @@ DATABASES = {
 }
 
 
+# Тесты (manage.py test и pytest) работают со своим файлом кеша и
+# префиксом ключей: их cache.clear() не стирает кеш сервера разработки,
+# а записи тестовой базы не смешиваются с записями рабочей.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+# Кеш общий для всех процессов-воркеров: один файл SQLite в режиме WAL.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(
+            BASE_DIR, 'cache-test.sqlite3' if TESTING else 'cache.sqlite3'
+        ),
+        'KEY_PREFIX': 'test' if TESTING else '',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'MAX_SIZE': 256 * 2 ** 20,
+        },
+    }
+}
+
+# Сколько секунд живёт кеш страницы, если его не сбросила инвалидация.
+PAGE_CACHE_TIMEOUT = 600
+
+# Шаблоны, которые можно вставлять в общие страницы тегом
+# personal_fragment: они рендерятся для каждого запроса отдельно.
+PERSONAL_FRAGMENTS = (
+    'includes/header.html',
+    'posts/includes/post_actions.html',
+)
+
+# Перед общим кешем страниц и запросов — LRU в памяти каждого процесса.
+# EARLY_REFRESH_BETA > 1 пересчитывает значения раньше истечения срока,
+# LOCK_TIMEOUT — сколько секунд ждать значение, которое считает другой
+# процесс, прежде чем посчитать его самому.
+TIERED_CACHE = {
+    'LOCAL_MAX_ENTRIES': 1000,
+    'EARLY_REFRESH_BETA': 1.0,
+    'LOCK_TIMEOUT': 10,
+}
+
+# Доля запросов, для которых core.timing отдаёт заголовок Server-Timing
+# со временем представления, SQL и шаблонов. С LOG то же время пишется
+# строкой JSON в журнал core.timing; по умолчанию журнал выключен, чтобы
+# не засорять вывод runserver и тестов.
+SERVER_TIMING = {
+    'SAMPLE_RATE': 0.05,
+    'HEADER': True,
+    'LOG': False,
+}
+
+# Профайлер core.profiler: раз в INTERVAL секунд снимает стеки запросов
+# в течение DURATION секунд (не дольше MAX_DURATION) и пишет результат в
+# OUTPUT_DIR. Запускается со страницы admin/profiler/ или сигналом SIGNAL.
+PROFILER = {
+    'INTERVAL': 0.005,
+    'DURATION': 10,
+    'MAX_DURATION': 120,
+    'OUTPUT_DIR': os.path.join(BASE_DIR, 'profiles'),
+    'SIGNAL': 'SIGUSR2',
+}
+
+# Замеры памяти core.memory: доля запросов под tracemalloc (0 — выключено),
+# число мест выделения в сводке, WINDOW последних замеров на URL и порог
+# GROWTH_BYTES, выше которого память после каждого из них считается ростом.
+MEMORY_TRACKING = {
+    'SAMPLE_RATE': 0.0,
+    'TOP': 10,
+    'WINDOW': 10,
+    'GROWTH_BYTES': 64 * 1024,
+    'TIMEOUT': 24 * 60 * 60,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -138,3 +232,12 @@ PASSWORD_CHANGE_DONE_URL = 'posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Сколько секунд паджинатор может показывать закешированное число записей.
+PAGINATOR_COUNT_TIMEOUT = 60
+
+# Сколько секунд хранится отрендеренная карточка поста в ленте.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Сколько секунд хранится результат Model.objects.cached().get().
+QUERY_CACHE_TIMEOUT = 600